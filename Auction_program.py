@@ -1,11 +1,6 @@
-from replit import clear
+from terminal import clear
 import art
 
-print(art.logo_Auction)
-
-bids = {}
-bidding_finished = False
-
 def find_highest_bidder(bidding_record):
   highest_bid = 0
   winner = ""
@@ -17,13 +12,19 @@ def find_highest_bidder(bidding_record):
       winner = bidder
   print(f"The winner is {winner} with a bid of ${highest_bid}")
 
-while not bidding_finished:
-  name = input("What is your name?: ")
-  price = int(input("What is your bid?: $"))
-  bids[name] = price
-  should_continue = input("Are there any other bidders? Type 'yes or 'no'.\n")
-  if should_continue == "no":
-    bidding_finished = True
-    find_highest_bidder(bids)
-  elif should_continue == "yes":
-    clear()
\ No newline at end of file
+if __name__ == "__main__":
+  print(art.logo_Auction)
+
+  bids = {}
+  bidding_finished = False
+
+  while not bidding_finished:
+    name = input("What is your name?: ")
+    price = int(input("What is your bid?: $"))
+    bids[name] = price
+    should_continue = input("Are there any other bidders? Type 'yes or 'no'.\n")
+    if should_continue == "no":
+      bidding_finished = True
+      find_highest_bidder(bids)
+    elif should_continue == "yes":
+      clear()
@@ -0,0 +1,74 @@
+# Vectorized scoring of many blackjack hands at once.
+#
+# score() is called for every hand of every simulated round, which makes it the
+# hottest function in a simulation. Scoring hands one at a time in Python is
+# slow no matter how it's written, so this module scores a whole batch of
+# hands with a handful of NumPy operations instead.
+#
+# Hands are encoded as rows of a 2-D integer array.
+# Each card is its rank code: A=1, 2=2, ... 10=10, J=11, Q=12, K=13.
+# Rows shorter than the widest hand are padded with 0.
+import numpy as np
+
+from cards import Card, Deck
+
+ACE = 1
+PADDING = 0
+# Every rank code above 10 is a face card worth 10 points.
+TEN = 10
+
+def rank_code(card: Card) -> int:
+    ''' Return the rank code of a card.
+
+        >>> rank_code(Card('♠', 'A')), rank_code(Card('♥', '10')), rank_code(Card('♣', 'K'))
+        (1, 10, 13)
+    '''
+    return Deck.ranks.index(card.rank) + 1
+
+def encode_hands(hands: list[list[Card]]) -> np.ndarray:
+    ''' Encode lists of cards into a padded 2-D array of rank codes.
+
+        >>> encode_hands([[Card('♠', 'K'), Card('♠', 'A')], [Card('♠', '2'), Card('♠', '3'), Card('♠', '5')]])
+        array([[13,  1,  0],
+               [ 2,  3,  5]], dtype=uint8)
+    '''
+    width = max((len(hand) for hand in hands), default=0)
+    encoded = np.zeros((len(hands), width), dtype=np.uint8)
+    for row, hand in enumerate(hands):
+        encoded[row, :len(hand)] = [rank_code(card) for card in hand]
+    return encoded
+
+def score_batch(hands: np.ndarray) -> np.ndarray:
+    ''' Score every row of an array of encoded hands in a single vectorized pass.
+
+        Produces the same totals as score(), including the handling of soft aces.
+        >>> score_batch(np.array([[13, 1, 0], [13, 1, 1], [2, 3, 5]]))
+        array([21, 12, 10], dtype=int16)
+
+        Randomized hands score identically to score().
+        >>> from blackjack import score
+        >>> rng = np.random.default_rng(0)
+        >>> encoded = rng.integers(1, 14, size=(10_000, 6))
+        >>> encoded[rng.random(encoded.shape) < 0.3] = PADDING
+        >>> hands = [[Card('♠', Deck.ranks[code - 1]) for code in row if code] for row in encoded]
+        >>> bool((score_batch(encoded) == [score(hand) for hand in hands]).all())
+        True
+    '''
+    hands = np.asarray(hands)
+    # Count every ace as 1 to get the hard total. Face cards are worth 10.
+    points = np.minimum(hands, TEN)
+    # Hands are narrow and batches are tall, so adding one column at a time is
+    # several times faster than summing along the rows.
+    hard = np.zeros(len(hands), dtype=np.int16)
+    has_ace = np.zeros(len(hands), dtype=bool)
+    for column in range(hands.shape[1]):
+        hard += points[:, column]
+        has_ace |= hands[:, column] == ACE
+    # At most one ace can ever count as 11, since two would be 22.
+    # score() starts every ace at 11 and demotes them while over 21, which is the same thing.
+    soft = has_ace & (hard <= 11)
+    return hard + soft * np.int16(10)
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(optionflags=doctest.IGNORE_EXCEPTION_DETAIL)
@@ -1,8 +1,15 @@
-# Imports the built-in os module to clear the screen.
+# Imports the built-in os and sys modules to find the shared terminal module.
 import os
+import sys
+# Imports the built-in time module to time the steps of a round.
+import time
 
 # Imports the Card and Deck from the cards module.
-from cards import Card, Deck
+from cards import Card, Deck, Shoe
+
+# The terminal module is shared by all of the games and lives in the repository root.
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import terminal
 
 class GameOver(Exception):
     ''' An exception raised when the player is out of money. 
@@ -13,6 +20,133 @@ class GameOver(Exception):
         GameOver: Better luck next time!
     '''
 
+# Create a point value lookup using a dictionary.
+# Aces can be used as either a 1 or an 11. 
+# This lookup sets the default as 11.
+# It's defined once here rather than being rebuilt on every call to score.
+SCORES = {
+    'A': 11,
+    '2': 2,
+    '3': 3,
+    '4': 4,
+    '5': 5,
+    '6': 6,
+    '7': 7,
+    '8': 8,
+    '9': 9,
+    '10': 10,
+    'J': 10,
+    'Q': 10,
+    'K': 10,
+}
+
+class Hand(list):
+    ''' A list of cards that keeps a running score.
+
+        Adding a card updates the hard total, which counts aces as 1, and the
+        number of aces. The score and the other properties are then O(1),
+        instead of rescanning every card like score does for a plain list.
+        >>> hand = Hand([Card('♠', 'K')])
+        >>> hand.append(Card('♠', 'A'))
+        >>> hand.score, hand.is_soft, hand.is_blackjack
+        (21, True, True)
+        >>> hand += [Card('♥', 'A'), Card('♥', 'K')]
+        >>> hand.score, hand.is_soft, hand.is_bust
+        (22, False, True)
+
+        Any other change to the cards recounts the hand.
+        >>> hand.pop()
+        K♥
+        >>> hand.score == score(list(hand)) == 12
+        True
+        >>> hand *= 2
+        >>> hand.score == score(list(hand)) == 24
+        True
+
+        Copies and pickled hands count their cards once.
+        >>> import copy, pickle
+        >>> hand = Hand([Card('♠', 'K'), Card('♠', '5')])
+        >>> copy.copy(hand).score, copy.deepcopy(hand).score, pickle.loads(pickle.dumps(hand)).score
+        (15, 15, 15)
+    '''
+    def __init__(self, cards=()):
+        super().__init__(cards)
+        self._recount()
+
+    def _recount(self):
+        ''' Recompute the running totals from every card. '''
+        self.aces = 0
+        self.hard = 0
+        for card in self:
+            self._count(card)
+
+    def _count(self, card: Card):
+        ''' Add a single card to the running totals. '''
+        if card.rank == 'A':
+            self.aces += 1
+            self.hard += 1
+        else:
+            self.hard += SCORES[card.rank]
+
+    def append(self, card: Card):
+        super().append(card)
+        self._count(card)
+
+    def extend(self, cards):
+        cards = list(cards)
+        super().extend(cards)
+        for card in cards:
+            self._count(card)
+
+    def __iadd__(self, cards):
+        self.extend(cards)
+        return self
+
+    # Removing or replacing cards is rare, so those simply recount the hand.
+    def _recounting(method):
+        def recount(self, *args):
+            result = method(self, *args)
+            self._recount()
+            return result
+        recount.__name__ = method.__name__
+        return recount
+
+    pop = _recounting(list.pop)
+    remove = _recounting(list.remove)
+    insert = _recounting(list.insert)
+    clear = _recounting(list.clear)
+    __setitem__ = _recounting(list.__setitem__)
+    __delitem__ = _recounting(list.__delitem__)
+    __imul__ = _recounting(list.__imul__)
+    del _recounting
+
+    # copy and pickle would otherwise restore the running totals and then extend
+    # the hand with its cards again. Rebuilding from the cards counts them once.
+    def __reduce__(self):
+        return (Hand, (list(self),))
+
+    def __copy__(self):
+        return Hand(self)
+
+    @property
+    def score(self) -> int:
+        ''' The same total as score(). At most one ace counts as 11, and only when that doesn't bust. '''
+        return self.hard + 10 if self.aces and self.hard <= 11 else self.hard
+
+    @property
+    def is_soft(self) -> bool:
+        ''' True when an ace is counting as 11. '''
+        return bool(self.aces) and self.hard <= 11
+
+    @property
+    def is_bust(self) -> bool:
+        return self.score > 21
+
+    @property
+    def is_blackjack(self) -> bool:
+        ''' True for 21 with the first two cards. '''
+        return len(self) == 2 and self.score == 21
+
 class Player:
     ''' Represents a blackjack player - which includes a dealer.
 
@@ -30,7 +164,21 @@ class Player:
     '''
     def __init__(self):
         self.money = 1_000
-        self.cards = []
+        self.cards = Hand()
+
+    @property
+    def cards(self) -> Hand:
+        ''' The player's cards. Assigning a list of cards stores it as a Hand.
+            >>> player = Player()
+            >>> player.cards = [Card('♠', '9'), Card('♠', '7')]
+            >>> player.cards.score
+            16
+        '''
+        return self._cards
+
+    @cards.setter
+    def cards(self, cards):
+        self._cards = cards if isinstance(cards, Hand) else Hand(cards)
 
 def prompt_for_bet(money: int) -> int:
     ''' Continuously prompt for a numeric bet until provided. '''
@@ -78,26 +226,11 @@ def score(cards: list[Card]) -> int:
         >>> assert score([_k, _a, _a]) == 12
         >>> assert score([_2, _3, _5]) == 10
     '''
-    # Create a point value lookup using a dictionary.
-    # Aces can be used as either a 1 or an 11. 
-    # This lookup sets the default as 11.
-    scores = {
-        'A': 11,
-        '2': 2,
-        '3': 3,
-        '4': 4,
-        '5': 5,
-        '6': 6,
-        '7': 7,
-        '8': 8,
-        '9': 9,
-        '10': 10,
-        'J': 10,
-        'Q': 10,
-        'K': 10,
-    }
+    # A Hand keeps its score up to date as cards are added.
+    if isinstance(cards, Hand):
+        return cards.score
     # Calculate the score assuming the ace is 11.
-    score = sum([scores[card.rank] for card in cards]) or 0
+    score = sum([SCORES[card.rank] for card in cards]) or 0
     # Adjust the score if needed to allow aces to be used as 1.
     for card in cards:
         # If the score is greater than 21 and at least one of the
@@ -107,6 +240,50 @@ def score(cards: list[Card]) -> int:
             score -= 10
     return score
 
+def dealer_turn(dealer: Player, deck: Deck):
+    ''' Play the dealer's hand using the house rules.
+
+        We're going to create some basic rules to simulate a real person as the dealer.
+        While the score of the dealer's hand is less than 17 keep taking cards.
+        >>> dealer = Player()
+        >>> dealer.cards = [Card('♠', '10'), Card('♠', '2')]
+        >>> deck = Deck()
+        >>> dealer_turn(dealer, deck)
+        >>> dealer.cards
+        [10♠, 2♠, K♣]
+    '''
+    while score(dealer.cards) < 17:
+        dealer.cards.append(deck.deal())
+
+def settle(player: Player, dealer: Player, wager: int) -> str:
+    ''' Determine who won the round, pay out the wager and return the winner.
+
+        if the player scored 21 then they win. 
+        if the dealer scored more than 21 the player wins.
+        if the player scores higher than the dealer and they didn't go over 21 then the player wins.
+        >>> player, dealer = Player(), Player()
+        >>> player.cards = [Card('♠', 'K'), Card('♠', 'A')]
+        >>> dealer.cards = [Card('♥', 'K'), Card('♥', 'Q')]
+        >>> settle(player, dealer, 100)
+        'player'
+        >>> player.money
+        1200
+        >>> settle(dealer, player, 100)
+        'dealer'
+        >>> dealer.money
+        900
+    '''
+    dealers_score = score(dealer.cards)
+    players_score = score(player.cards)
+
+    # Who won...
+    # This logic does not fully align with the actual rules of blackjack. 
+    if (players_score == 21 or dealers_score > 21 or (players_score >= dealers_score and players_score <= 21)):
+        player.money += wager * 2
+        return 'player'
+    player.money -= wager
+    return 'dealer'
+
 def format_winner(winner: str) -> str:
     ''' Format the message displayed to the winner and return the str. 
 
@@ -127,17 +304,24 @@ def format_cards(player: Player, dealer: Player) -> str:
     return cards
 
 def clear_screen():
-    ''' Clear the terminal screen using either cls on Windows otherwise clear. 
-
-        The double pipe operator || on Linux and Windows is used to 
-        attempt the first command and fallback to the second.
+    ''' Clear the terminal screen using ANSI escape sequences. 
 
-        So cls||clear attempts cls and if a non-zero status code is returned clear is attempted.
+        Previously this ran cls||clear with os.system, which started a new process for every redraw.
     '''
-    os.system('cls||clear')
+    terminal.clear()
+    terminal.screen.reset()
 
+def render(player: Player, dealer: Player, instrumentation=None):
+    ''' Draw the cards, only rewriting the lines of the terminal that changed. '''
+    if instrumentation is None:
+        terminal.screen.draw(format_cards(player, dealer))
+        return
+    started = time.perf_counter()
+    terminal.screen.draw(format_cards(player, dealer))
+    instrumentation.record('rendering', time.perf_counter() - started)
 
-def play_round(player: Player, dealer: Player, deck: Deck, action_callable: callable = input, bet_callable: callable = prompt_for_bet):
+
+def play_round(player: Player, dealer: Player, deck: Deck, action_callable: callable = input, bet_callable: callable = prompt_for_bet, history=None, instrumentation=None):
     ''' Play a single round of blackjack. 
 
         Args:
@@ -156,6 +340,8 @@ def play_round(player: Player, dealer: Player, deck: Deck, action_callable: call
             bet_callable    | Callable used to prompt a user for their bet.
                             |> The callable must accept 1 positional int argument representing a player's available money.
                             |> The callable must return a positive int representing the bet.
+            history         | (optional) A HistoryWriter that records the settled hand.
+            instrumentation | (optional) An Instrumentation that records the time spent in each step.
 
 
         ------------------- Warning -------------------
@@ -213,6 +399,9 @@ def play_round(player: Player, dealer: Player, deck: Deck, action_callable: call
     '''
     
 
+    # Time each step when instrumentation is provided. Otherwise timer stays None and costs nothing.
+    timer = instrumentation.timer() if instrumentation is not None else None
+
     # Step 1 
     # Ensure the player has enough money to play. If not, game over!
     if player.money == 0:
@@ -228,6 +417,8 @@ def play_round(player: Player, dealer: Player, deck: Deck, action_callable: call
     # Ensure that the player has enough money to place the bet.
     while (rounds_wager := bet_callable(player.money)) > player.money:
         print(f'please change your bet. you bet ${rounds_wager}. you only have ${player.money}.')
+    if timer:
+        timer.lap('betting')
 
     # STEP 3
     # Deal two cards for the dealer. One needs to be face up.
@@ -235,8 +426,9 @@ def play_round(player: Player, dealer: Player, deck: Deck, action_callable: call
     # Deal two cards for the player
     player.cards = [deck.deal() for _ in range(2)]
     # Render the cards to the console.
-    clear_screen()
-    print(format_cards(player, dealer))
+    render(player, dealer, instrumentation)
+    if timer:
+        timer.lap('dealing')
 
     # STEP 4
     # The player needs to determine their next action. 
@@ -244,47 +436,43 @@ def play_round(player: Player, dealer: Player, deck: Deck, action_callable: call
     # By typing an s they'll stand.
     # By typing an h they'll hit.
     # Anything else will be ignored.
+    hits = 0
     while (action := action_callable('pick your action: (h)it (s)tand > ')) != 's':
         if action == 'h':
             # take another card for the player
             player.cards.append(deck.deal()) 
+            hits += 1
             # Everytime a player's cards change we need to render the cards.
-            clear_screen()
-            print(format_cards(player, dealer))
+            render(player, dealer, instrumentation)
+    if timer:
+        timer.lap('actions')
 
     # STEP 5
     # The dealer in a real game would determine for themself if they want to hit or stand.
-    # We're going to create some basic rules to simulate a real person as the dealer.
-    # While the score of the dealer's hand is less than 17 keep taking cards.
-    while score(dealer.cards) < 17:
-        dealer.cards.append(deck.deal())
+    # The rules used to simulate a real person as the dealer live in dealer_turn.
+    dealer_turn(dealer, deck)
+    if timer:
+        timer.lap('dealer')
 
     # STEP 6
     # Determine who won by comparing scores. 
-    # if the player scored 21 then they win. 
-    # if the dealer scored more than 21 the player wins.
-    # if the player scores higher than the dealer and they didn't go over 21 then the player wins.
-    dealers_score = score(dealer.cards)
-    players_score = score(player.cards)
-
-    # Who won...
-    # This logic does not fully align with the actual rules of blackjack. 
-    if (players_score == 21 or dealers_score > 21 or (players_score >= dealers_score and players_score <= 21)):
-        player.money += rounds_wager * 2
-        winner = 'player'
-    else:
-        player.money -= rounds_wager
-        winner = 'dealer'
+    # The rules for deciding the winner and paying out the wager live in settle.
+    winner = settle(player, dealer, rounds_wager)
+    # Keep a record of the hand when a history is provided.
+    if history is not None:
+        history.record(player, dealer, rounds_wager, hits, winner)
+    if timer:
+        timer.lap('scoring')
 
     # STEP 7 
     # Display all the cards, including the dealer's previously hidden cards.
     # First need to make them faceup.
     # Then the next time display is called it'll show all cards.
+    # Revealing through the deck lets any attached card counters see the hole card.
     for card in dealer.cards:
-        card.faceup = True
+        deck.reveal(card)
 
-    clear_screen()
-    print(format_cards(player, dealer))
+    render(player, dealer, instrumentation)
     # Inform the player who won. 
     print(format_winner(winner))
 
@@ -293,19 +481,24 @@ def play_round(player: Player, dealer: Player, deck: Deck, action_callable: call
     # Having played a round re-add the cards to the deck.
     # This likely breaks official game play rules or something.
     # However, it's how this functions. :P
-    deck.cards += player.cards
-    deck.cards += dealer.cards
+    deck.return_cards(player.cards)
+    deck.return_cards(dealer.cards)
+    if timer:
+        timer.lap('reveal')
 
 def play():
     ''' Continuously play until the player stops the code. '''
     player = Player()
     dealer = Player()
-    deck = Deck()
+    # Deal from a multi-deck shoe the same way a casino does.
+    shoe = Shoe()
 
     # Loop forever unless the code is interrupted by CTRL+C
     while True:
-        deck.shuffle()
-        play_round(player, dealer, deck)
+        # The shoe is only reshuffled once the cut card has been reached.
+        if shoe.needs_shuffle:
+            shoe.shuffle()
+        play_round(player, dealer, shoe)
 
 
 
@@ -326,9 +519,26 @@ if __name__ == '__main__':
 
     parser = argparse.ArgumentParser(description='Play a game of blackjack.')
     parser.add_argument('--test', action='store_true')
+    parser.add_argument('--simulate', type=int, metavar='N', help='play N hands headless and print a report')
+    parser.add_argument('--workers', type=int, help='simulate using a pool of this many processes')
+    parser.add_argument('--seed', type=int, default=0, help='seed used by --workers simulations')
+    parser.add_argument('--history', metavar='PATH', help='append every hand to a binary hand history')
 
-    if parser.parse_args().test:
+    args = parser.parse_args()
+    if args.test:
         doctest.testmod(optionflags=doctest.IGNORE_EXCEPTION_DETAIL, verbose=True)
+    elif args.simulate and args.workers:
+        from parallel import simulate_parallel
+        print(simulate_parallel(args.simulate, args.seed, workers=args.workers))
+    elif args.simulate and args.history:
+        from history import HistoryWriter
+        from simulation import Report, simulate
+        with HistoryWriter(args.history) as history:
+            print(Report(simulate(args.simulate, history=history)))
+    elif args.simulate:
+        # The simulation module imports from this one, so it is only imported when needed.
+        from simulation import Report, simulate
+        print(Report(simulate(args.simulate)))
     else:
         try:
             play()
@@ -0,0 +1,93 @@
+# Load generator for the blackjack server.
+#
+# Opens many connections at once, each played by a bot that bets a flat
+# amount and hits below 17, the same as the default simulation Strategy.
+# The round trip latency of every action and the hands played are reported at the end.
+import asyncio
+import time
+
+from server import percentile
+
+class Bot:
+    ''' A single bot session. '''
+    def __init__(self, hands: int, wager=10, stand_on=17):
+        self.hands = hands
+        self.wager = wager
+        self.stand_on = stand_on
+        self.played = 0
+        self.latencies = []
+
+    def reply(self, prompt: str) -> str:
+        ''' Answer a prompt from the server.
+
+            >>> bot = Bot(hands=1)
+            >>> bot.reply('bet 5'), bot.reply('bet 500'), bot.reply('action 12'), bot.reply('action 19')
+            ('5', '10', 'h', 's')
+        '''
+        kind, value = prompt.split()
+        if kind == 'bet':
+            return str(min(self.wager, int(value)))
+        return 'h' if int(value) < self.stand_on else 's'
+
+    async def play(self, host: str, port: int):
+        ''' Connect and play until enough hands are played or the session ends. '''
+        reader, writer = await asyncio.open_connection(host, port)
+        sent = None
+        try:
+            while line := (await reader.readline()).decode():
+                if line.startswith('! '):
+                    break
+                if not line.startswith('? '):
+                    continue
+                if sent is not None:
+                    self.latencies.append(time.perf_counter() - sent)
+                prompt = line[2:].strip()
+                # Every bet after the first one means a hand has been completed.
+                if prompt.startswith('bet'):
+                    if self.played == self.hands:
+                        break
+                    self.played += 1
+                writer.write(self.reply(prompt).encode() + b'\n')
+                await writer.drain()
+                sent = time.perf_counter()
+        finally:
+            writer.close()
+
+async def run(sessions: int, hands: int, host='127.0.0.1', port=8021, concurrency=500):
+    ''' Play the sessions with at most concurrency connections open at once and print a report. '''
+    limit = asyncio.Semaphore(concurrency)
+    bots = [Bot(hands) for _ in range(sessions)]
+
+    async def play(bot):
+        async with limit:
+            await bot.play(host, port)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[play(bot) for bot in bots])
+    elapsed = time.perf_counter() - started
+
+    latencies = [latency for bot in bots for latency in bot.latencies]
+    played = sum(bot.played for bot in bots)
+    print(f'sessions: {sessions} | hands: {played} | hands/s: {played / elapsed:,.0f}', end='')
+    if latencies:
+        print(f' | round trip p50: {percentile(latencies, 0.5) * 1e6:,.0f}µs'
+              f' | round trip p99: {percentile(latencies, 0.99) * 1e6:,.0f}µs', end='')
+    print()
+
+if __name__ == '__main__':
+    import argparse
+    import doctest
+
+    parser = argparse.ArgumentParser(description='Play many bot sessions against the blackjack server.')
+    parser.add_argument('--test', action='store_true')
+    parser.add_argument('--sessions', type=int, default=1_000)
+    parser.add_argument('--hands', type=int, default=20, help='hands played by each session')
+    parser.add_argument('--concurrency', type=int, default=500, help='connections open at once')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8021)
+
+    args = parser.parse_args()
+    if args.test:
+        doctest.testmod(optionflags=doctest.IGNORE_EXCEPTION_DETAIL)
+    else:
+        asyncio.run(run(args.sessions, args.hands, args.host, args.port, args.concurrency))
@@ -1,5 +1,9 @@
 # use Python's built-in random module to shuffle the deck of cards.
 import random
+# use Python's built-in array module to store a deck as one byte per card.
+from array import array
+# MutableSequence provides the list methods of a deck's cards from a few basic ones.
+from collections.abc import MutableSequence
 
 # Card models a physical playing card.
 class Card:
@@ -13,6 +17,10 @@ class Card:
         >>> str(card)  
         'c@'
     '''
+    # __slots__ replaces the per-instance __dict__ with fixed attribute storage.
+    # This makes each card considerably smaller in memory.
+    __slots__ = ('suit', 'rank', 'faceup', 'code')
+
     # Constructor method requires the suit and rank. 
     # faceup is an optional keyword parameter defaulting to: True.
     def __init__(self, suit, rank, faceup=True):
@@ -29,6 +37,24 @@ class Card:
         self.rank = rank
         # Cards can be either face up or face down in enough card games that a faceup attribute is included.
         self.faceup = faceup
+        # The code is the card's position in a new Deck: 0 for A♠ through 51 for K♣.
+        # Cards that aren't part of a standard deck don't have a code.
+        self.code = _CODES.get((suit, rank))
+
+    @classmethod
+    def from_code(cls, code, faceup=True):
+        ''' Create a card from its code. 
+            The suit and rank strings are shared by every card with the same code.
+            >>> Card.from_code(0), Card.from_code(51), Card.from_code(13, faceup=False)
+            (A♠, K♣, ??)
+            >>> Card('♥', 'Q').code
+            37
+        '''
+        card = cls.__new__(cls)
+        card.suit, card.rank = _FACES[code]
+        card.faceup = faceup
+        card.code = code
+        return card
     
     # Defining a __str__ is quite useful for console based apps.
     def __str__(self):
@@ -69,8 +95,76 @@ class Card:
         # Prioritize readability over premature optimization.
         return str(self)
 
+# Counted lets card counters watch the cards dealt by a deck or a shoe.
+class Counted:
+    ''' Sends every card that becomes visible to the attached counters.
+
+        Cards dealt face up are counted as they're dealt. Cards dealt face down are
+        counted when they're revealed. Without counters dealing only checks an empty list.
+    '''
+    def attach(self, counter):
+        ''' Start sending cards to a counter. The counter can use the deck to find the cards remaining.
+            The counter is reset, so its count starts from the deck it is attached to.
+        '''
+        counter.deck = self
+        counter.reset()
+        self.counters.append(counter)
+
+    def detach(self, counter):
+        self.counters.remove(counter)
+
+    def reveal(self, card):
+        ''' Turn a card face up, counting it if it was face down. '''
+        if not card.faceup:
+            card.faceup = True
+            self._seen(card.code)
+
+    def _seen(self, code):
+        for counter in self.counters:
+            counter.observe(code)
+
+    def _reset_counters(self):
+        for counter in self.counters:
+            counter.reset()
+
+# DeckCards lets the cards of a deck be used like a list.
+class DeckCards(MutableSequence):
+    ''' A list-like view of a deck's cards, reading and writing the deck's codes.
+        Every list method is available, including slicing, append, pop and random.shuffle.
+    '''
+    __slots__ = ('deck',)
+
+    def __init__(self, deck):
+        self.deck = deck
+
+    def __len__(self):
+        return len(self.deck.codes)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [Card.from_code(code) for code in self.deck.codes[index]]
+        return Card.from_code(self.deck.codes[index])
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            self.deck.codes[index] = array('B', [Deck._code(card) for card in value])
+        else:
+            self.deck.codes[index] = Deck._code(value)
+
+    def __delitem__(self, index):
+        del self.deck.codes[index]
+
+    def insert(self, index, card):
+        self.deck.codes.insert(index, Deck._code(card))
+
+    def __iter__(self):
+        return (Card.from_code(code) for code in self.deck.codes)
+
+    def __repr__(self):
+        return repr(list(self))
+
 # Deck models a standard US deck of cards.
-class Deck:
+class Deck(Counted):
     ''' A deck based on a standard US card deck.
         Consists of 13 possible card ranks from Ace to King.
         Consists of  4 possible card suits: spade, diamond, heart, club.
@@ -83,8 +177,13 @@ class Deck:
     '''
     suits = '♠ ♦ ♥ ♣'.split()
     ranks = 'A 2 3 4 5 6 7 8 9 10 J Q K'.split()
-    def __init__(self):
+    def __init__(self, rng=None, shuffler=None):
         ''' Create a new deck consisting of one rank for each suit.
+            Args:
+                rng      |   (optional) The source of randomness used by shuffle. Defaults to the random module.
+                         |>  Provide a seeded random.Random to make shuffles reproducible.
+                shuffler |   (optional) A ShuffleProvider used instead of rng to shuffle the full deck.
+
             Produces a new list using a list comprehension to loop over all of the ranks for each suit.
             Nested list comprehensions can be difficult to read at times. Especially for new Python developers.
             The same result using a for loops:
@@ -100,15 +199,85 @@ class Deck:
             >>> [Card(s,r) for s in Deck.suits for r in Deck.ranks]
             [A♠, 2♠, 3♠, 4♠, 5♠, 6♠, 7♠, 8♠, 9♠, 10♠, J♠, Q♠, K♠, A♦, 2♦, 3♦, 4♦, 5♦, 6♦, 7♦, 8♦, 9♦, 10♦, J♦, Q♦, K♦, A♥, 2♥, 3♥, 4♥, 5♥, 6♥, 7♥, 8♥, 9♥, 10♥, J♥, Q♥, K♥, A♣, 2♣, 3♣, 4♣, 5♣, 6♣, 7♣, 8♣, 9♣, 10♣, J♣, Q♣, K♣]
         '''
-        self.cards = [Card(s,r) for s in self.suits for r in self.ranks]
+        # The deck stores the code of each card instead of Card objects: one byte per card.
+        # Copying the prebuilt full deck is much faster than creating 52 cards.
+        # Card objects are only created when they're dealt or when cards is read.
+        self.codes = array('B', _FULL_DECK)
+        self.rng = rng or random
+        self.shuffler = shuffler
+        # Counters attached with attach. See the counting module.
+        self.counters = []
+
+    @property
+    def cards(self):
+        ''' The cards in the deck as a list. The last card in the list is the "top" of the deck.
+            The list is a view of the deck, so changing it changes the deck.
+            Assigning a list of cards replaces the deck's contents.
+            >>> deck = Deck()
+            >>> deck.cards = [Card('♠', 'K'), Card('♠', 'A')]
+            >>> deck.cards
+            [K♠, A♠]
+            >>> deck.cards.append(Card('♥', '7'))
+            >>> deck.cards.pop(0)
+            K♠
+            >>> deck.cards, len(deck)
+            ([A♠, 7♥], 2)
+            >>> random.Random(3).shuffle(deck.cards)
+            >>> sorted(str(card) for card in deck.cards)
+            ['7♥', 'A♠']
+
+            The deck stores one byte per card, so it only holds cards of a standard deck.
+            Cards read from it are new Card objects, face up.
+            >>> deck.cards.append(Card('@', 'c'))
+            Traceback (most recent call last):
+            ...
+            ValueError: c@ is not part of a standard deck.
+        '''
+        return DeckCards(self)
+
+    @cards.setter
+    def cards(self, cards):
+        self.codes = array('B', [self._code(card) for card in cards])
+
+    @staticmethod
+    def _code(card):
+        ''' Return the code of a card, ensuring it belongs in a standard deck. '''
+        if card.code is None:
+            raise ValueError(f'{card.rank}{card.suit} is not part of a standard deck.')
+        return card.code
+
+    def return_cards(self, cards):
+        ''' Put cards back on top of the deck, in order. 
+            >>> deck = Deck()
+            >>> hand = [deck.deal(), deck.deal()]
+            >>> len(deck)
+            50
+            >>> deck.return_cards(hand)
+            >>> len(deck), deck.cards[-1]
+            (52, Q♣)
+        '''
+        self.codes.extend([self._code(card) for card in cards])
 
 
     def shuffle(self):
         ''' Models the ability to shuffle a deck of cards.
-            Uses the shuffle function from the random module.
+            Uses the shuffle function from the deck's rng, which defaults to the random module.
+            Two decks with identically seeded rngs are shuffled into the same order.
+            >>> a, b = Deck(random.Random(42)), Deck(random.Random(42))
+            >>> a.shuffle(); b.shuffle()
+            >>> str(a) == str(b)
+            True
+
+            With a shuffler a full deck is replaced by the next pre-shuffled deck.
+            A deck missing cards is still shuffled with rng.
         '''
-        random.shuffle(self.cards)
+        self.codes = _shuffle(self, self.codes)
+        self._reset_counters()
 
+    @property
+    def needs_shuffle(self):
+        ''' A single deck is shuffled before every round. '''
+        return True
 
     def deal(self, faceup=True):
         ''' Models the ability to deal a card. 
@@ -131,10 +300,11 @@ class Deck:
             >>> card.rank, card.suit
             ('Q', '♣')
         '''
-        # pop removes a card from the deck
-        card = self.cards.pop()
-        # Ensure the card is correctly placed face up or down.
-        card.faceup = faceup
+        # pop removes a card's code from the deck.
+        # The card is created face up or down as requested.
+        card = Card.from_code(self.codes.pop(), faceup)
+        if self.counters and faceup:
+            self._seen(card.code)
         # Return the card. 
         # Which is now removed from the deck and subject to being 
         # lost if not re-added before discarding.
@@ -159,9 +329,140 @@ class Deck:
             >>> len(Deck())
             52
         '''
-        return len(self.cards)
+        return len(self.codes)
+
+
+# Shoe models the dealing shoe used by casinos.
+class Shoe(Counted):
+    ''' A dealing shoe holding several decks shuffled together.
+
+        Cards are dealt by moving a cursor through the shuffled cards rather than
+        by removing them from a list. Played cards go into a discard tray and the
+        shoe is only reshuffled once the cut card is reached.
+        >>> shoe = Shoe(decks=2, penetration=0.5, rng=random.Random(1))
+        >>> len(shoe)
+        104
+        >>> hand = [shoe.deal() for _ in range(52)]
+        >>> shoe.needs_shuffle
+        True
+        >>> shoe.return_cards(hand)
+        >>> len(shoe), len(shoe.discards)
+        (52, 52)
+        >>> shoe.shuffle()
+        >>> len(shoe), len(shoe.discards), shoe.needs_shuffle
+        (104, 0, False)
+    '''
+    def __init__(self, decks=6, penetration=0.75, rng=None, shuffler=None):
+        ''' The Shoe constructor. The new shoe is shuffled and ready to deal.
+            Args:
+                decks       |   (optional) The number of standard decks in the shoe.
+                penetration |   (optional) The fraction of the shoe dealt before the cut card is reached.
+                rng         |   (optional) The source of randomness used by shuffle. Defaults to the random module.
+                shuffler    |   (optional) A ShuffleProvider for the same number of decks, used instead of rng.
+        '''
+        if not 0 < penetration <= 1:
+            raise ValueError('penetration must be greater than 0 and at most 1.')
+        self.decks = decks
+        self.penetration = penetration
+        self.rng = rng or random
+        self.shuffler = shuffler
+        # Every deck contributes the codes 0 to 51 once.
+        self.codes = array('B', _FULL_DECK * decks)
+        # The discard tray holds the codes of cards that have been played.
+        self.discards = array('B')
+        # Cards are dealt from the end of codes. remaining is the number of cards not yet dealt.
+        self.remaining = len(self.codes)
+        self.counters = []
+        self.shuffle()
+
+    @property
+    def cards(self):
+        ''' The undealt cards in the shoe as a list. The last card in the list is dealt next. '''
+        return [Card.from_code(code) for code in self.codes[:self.remaining]]
+
+    @property
+    def needs_shuffle(self):
+        ''' True once the cut card has been reached. '''
+        return len(self.codes) - self.remaining >= self.penetration * self.decks * len(_FULL_DECK)
+
+    def shuffle(self):
+        ''' Gather the undealt cards and the discard tray and shuffle them together.
+            Cards that are still in a player's hand are not part of the shuffle.
+        '''
+        self.codes = _shuffle(self, self.codes[:self.remaining] + self.discards)
+        self.discards = array('B')
+        self.remaining = len(self.codes)
+        self._reset_counters()
+
+    def deal(self, faceup=True):
+        ''' Deal the next card from the shoe by moving the cursor. 
+            >>> shoe = Shoe(decks=1)
+            >>> str(shoe.cards[-1]) == str(shoe.deal())
+            True
+
+            An empty shoe shuffles the discard tray back in. Cards still in hands stay out.
+            >>> shoe = Shoe(decks=1, penetration=1.0)
+            >>> played = [shoe.deal() for _ in range(50)]
+            >>> shoe.return_cards(played)
+            >>> hand = [shoe.deal() for _ in range(2)]
+            >>> len(shoe), len(shoe.discards)
+            (0, 50)
+            >>> card = shoe.deal()
+            >>> len(shoe), len(shoe.discards)
+            (49, 0)
+            >>> shoe = Shoe(decks=1)
+            >>> hand = [shoe.deal() for _ in range(52)]
+            >>> shoe.deal()
+            Traceback (most recent call last):
+            ...
+            IndexError: deal from an empty shoe
+        '''
+        if not self.remaining:
+            if not self.discards:
+                raise IndexError('deal from an empty shoe')
+            self.shuffle()
+        self.remaining -= 1
+        code = self.codes[self.remaining]
+        if self.counters and faceup:
+            self._seen(code)
+        return Card.from_code(code, faceup)
+
+    def return_cards(self, cards):
+        ''' Place played cards in the discard tray. '''
+        self.discards.extend([Deck._code(card) for card in cards])
+
+    def __str__(self):
+        ''' The magic method __str__ determines how this object is represented when converted to a str object. '''
+        return ' '.join([f'{c.rank}{c.suit},' for c in self.cards])
+
+    def __repr__(self):
+        ''' The magic method __repr__ determines how this object is represented when printed. '''
+        return str(self)
+
+    def __len__(self):
+        ''' The number of cards left to deal. '''
+        return self.remaining
+
+def _shuffle(source, codes):
+    ''' Return the shuffled codes of a deck or shoe.
+
+        When every card is present the shuffler's next pre-shuffled deck is used.
+        It holds the same cards, so this is equivalent to shuffling them.
+        Otherwise the codes are shuffled with the rng, as a list because
+        random.shuffle swaps list items faster than array items.
+    '''
+    if source.shuffler is not None and len(codes) == source.shuffler.size:
+        return array('B', source.shuffler.take())
+    shuffled = codes.tolist()
+    source.rng.shuffle(shuffled)
+    return array('B', shuffled)
+
+# Lookup tables shared by every card and deck.
+# _FACES maps a code to its (suit, rank) and _CODES maps a (suit, rank) back to its code.
+_FACES = [(s, r) for s in Deck.suits for r in Deck.ranks]
+_CODES = {face: code for code, face in enumerate(_FACES)}
+_FULL_DECK = array('B', range(len(_FACES)))
 
-    
 if __name__ == '__main__':
     import doctest
     doctest.testmod(optionflags=doctest.IGNORE_EXCEPTION_DETAIL)
\ No newline at end of file
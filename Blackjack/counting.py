@@ -0,0 +1,125 @@
+# Card counting.
+#
+# A counter gives every rank a tag and keeps the running total of the tags of
+# the cards it has seen. Attach a counter to a Deck or a Shoe and it's updated
+# as cards are dealt, one addition per card, so it can be read at any time,
+# including in the middle of a round.
+from cards import Deck
+from simulation import Strategy
+
+# The number of cards in a deck, used to estimate the decks remaining.
+DECK_SIZE = len(Deck.suits) * len(Deck.ranks)
+
+class Counter:
+    ''' A card counting system. Subclasses provide one tag per rank in Deck.ranks order.
+
+        >>> from cards import Shoe
+        >>> shoe = Shoe(decks=2)
+        >>> counter = HiLo()
+        >>> shoe.attach(counter)
+        >>> cards = [shoe.deal() for _ in range(52)]
+        >>> counter.running == sum(HiLo.tags[Deck.ranks.index(card.rank)] for card in cards)
+        True
+        >>> counter.true_count == counter.running / 1
+        True
+
+        Cards dealt face down are only counted once they're revealed.
+        >>> hidden = shoe.deal(faceup=False)
+        >>> before = counter.running
+        >>> shoe.reveal(hidden)
+        >>> counter.running - before == HiLo.tags[Deck.ranks.index(hidden.rank)]
+        True
+
+        Shuffling starts the count over.
+        >>> shoe.shuffle()
+        >>> counter.running
+        0
+    '''
+    tags = ()
+    # Balanced systems add up to 0 over a deck and start at 0.
+    # Unbalanced systems start at an initial running count that depends on the number of decks.
+    balanced = True
+
+    def __init__(self):
+        # Look up tags by card code instead of rank so observing is a single index.
+        self.values = [self.tags[code % len(Deck.ranks)] for code in range(DECK_SIZE)]
+        self.deck = None
+        self.running = 0
+
+    def initial(self) -> int:
+        ''' The running count of a freshly shuffled deck or shoe. '''
+        return 0
+
+    def reset(self):
+        self.running = self.initial()
+
+    def observe(self, code: int):
+        ''' Count a card by its code. '''
+        self.running += self.values[code]
+
+    @property
+    def decks_remaining(self) -> float:
+        ''' The number of decks left to deal, estimated from the attached deck. '''
+        return len(self.deck) / DECK_SIZE if self.deck is not None else 1.0
+
+    @property
+    def true_count(self) -> float:
+        ''' The running count per deck remaining. '''
+        decks = self.decks_remaining
+        return self.running / decks if decks else float(self.running)
+
+class HiLo(Counter):
+    ''' The Hi-Lo system: 2-6 count +1, 7-9 count 0, tens and aces count -1. '''
+    #       A  2  3  4  5  6  7  8  9 10  J  Q  K
+    tags = (-1, 1, 1, 1, 1, 1, 0, 0, 0, -1, -1, -1, -1)
+
+class KO(Counter):
+    ''' The Knock-Out system: like Hi-Lo but 7 counts +1, so it's unbalanced.
+
+        >>> from cards import Shoe
+        >>> counter = KO()
+        >>> Shoe(decks=6).attach(counter)
+        >>> counter.running
+        -20
+    '''
+    #       A  2  3  4  5  6  7  8  9 10  J  Q  K
+    tags = (-1, 1, 1, 1, 1, 1, 1, 0, 0, -1, -1, -1, -1)
+    balanced = False
+
+    def initial(self) -> int:
+        # The standard initial running count is 4 minus 4 per deck.
+        decks = getattr(self.deck, 'decks', 1)
+        return 4 - 4 * decks
+
+class OmegaII(Counter):
+    ''' The Omega II system, a balanced level two count. '''
+    #       A  2  3  4  5  6  7  8  9  10  J   Q   K
+    tags = (0, 1, 1, 2, 2, 2, 1, 0, -1, -2, -2, -2, -2)
+
+class BetSpread(Strategy):
+    ''' Bets more when the true count favors the player.
+
+        The wager is one unit, plus one more unit for every point of true count
+        above one, up to max_units. The bet method can also be used directly as
+        play_round's bet_callable.
+        >>> counter = HiLo()
+        >>> spread = BetSpread(counter, unit=10, max_units=8)
+        >>> counter.running = 3
+        >>> spread.bet(1_000)
+        30
+        >>> counter.running = -5
+        >>> spread.bet(1_000)
+        10
+    '''
+    def __init__(self, counter: Counter, unit=10, max_units=8, stand_on=17):
+        super().__init__(wager=unit, stand_on=stand_on)
+        self.counter = counter
+        self.max_units = max_units
+
+    def bet(self, money: int) -> int:
+        units = min(max(int(self.counter.true_count), 1), self.max_units)
+        return min(self.wager * units, money)
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(optionflags=doctest.IGNORE_EXCEPTION_DETAIL)
@@ -0,0 +1,186 @@
+# Append-only binary hand history.
+#
+# Every hand is stored as one fixed-size record so a file can be scanned
+# without parsing: record n always starts at byte n * RECORD.size.
+#  -------------------------------------------------------------
+# | field        | type     | notes                             |
+#  -------------------------------------------------------------
+# | player cards | 16 bytes | card code + 1, padded with 0      |
+# | dealer cards | 12 bytes | card code + 1, padded with 0      |
+# | wager        | uint32   |                                   |
+# | hits         | uint8    | the player's h actions            |
+# | winner       | uint8    | 1 for the player, 0 for the dealer|
+# | reserved     | 2 bytes  | keeps money aligned               |
+# | money        | int64    | the player's money after the hand |
+#  -------------------------------------------------------------
+# Codes are stored plus one so that 0 can mark an empty slot.
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from batch import score_batch
+from cards import Card
+
+PLAYER_CARDS = 16
+DEALER_CARDS = 12
+RECORD = struct.Struct(f'<{PLAYER_CARDS}s{DEALER_CARDS}sIBB2xq')
+
+# The same layout as a NumPy dtype, used to view a whole file as an array without copying it.
+DTYPE = np.dtype([
+    ('player', np.uint8, PLAYER_CARDS),
+    ('dealer', np.uint8, DEALER_CARDS),
+    ('wager', '<u4'),
+    ('hits', np.uint8),
+    ('winner', np.uint8),
+    ('reserved', np.uint8, 2),
+    ('money', '<i8'),
+])
+assert DTYPE.itemsize == RECORD.size
+
+def encode_cards(cards: list[Card], size: int) -> bytes:
+    ''' Encode cards as bytes of code + 1, padded with 0 to the provided size.
+
+        >>> encode_cards([Card('♠', 'A'), Card('♣', 'K')], 4)
+        b'\\x014\\x00\\x00'
+    '''
+    if len(cards) > size:
+        raise ValueError(f'a hand of {len(cards)} cards does not fit in a record.')
+    return bytes([card.code + 1 for card in cards]).ljust(size, b'\x00')
+
+def decode_cards(encoded) -> list[Card]:
+    ''' Decode the bytes of encode_cards back into face up cards.
+
+        >>> decode_cards(b'\\x014\\x00\\x00')
+        [A♠, K♣]
+    '''
+    return [Card.from_code(code - 1) for code in encoded if code]
+
+class HistoryWriter:
+    ''' Appends hands to a history file, writing them in batches.
+
+        >>> import tempfile
+        >>> from blackjack import Player
+        >>> path = os.path.join(tempfile.mkdtemp(), 'hands.bin')
+        >>> player, dealer = Player(), Player()
+        >>> player.cards = [Card('♠', 'K'), Card('♠', 'A')]
+        >>> dealer.cards = [Card('♥', 'K'), Card('♥', 'Q')]
+        >>> with HistoryWriter(path) as history:
+        ...     history.record(player, dealer, 100, 0, 'player')
+        >>> reader = HistoryReader(path)
+        >>> len(reader), decode_cards(reader[0][0]), reader[0][2:]
+        (1, [K♠, A♠], (100, 0, 1, 1000))
+        >>> reader.close()
+
+        Arrays from array() can outlive the reader.
+        >>> with HistoryReader(path) as reader:
+        ...     records = reader.array()
+        >>> records['wager']
+        array([100], dtype=uint32)
+    '''
+    def __init__(self, path: str, batch: int = 4096):
+        self.file = open(path, 'ab')
+        self.batch = batch
+        self.buffer = bytearray()
+        self.pending = 0
+
+    def record(self, player, dealer, wager: int, hits: int, winner: str):
+        ''' Add a settled hand. It's written once a full batch is buffered or on flush. '''
+        self.buffer += RECORD.pack(
+            encode_cards(player.cards, PLAYER_CARDS),
+            encode_cards(dealer.cards, DEALER_CARDS),
+            wager, hits, winner == 'player', player.money)
+        self.pending += 1
+        if self.pending >= self.batch:
+            self.flush()
+
+    def flush(self):
+        ''' Write the buffered records to the file. '''
+        self.file.write(self.buffer)
+        self.file.flush()
+        self.buffer.clear()
+        self.pending = 0
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class HistoryReader:
+    ''' Reads a history file through a memory map.
+
+        Records are unpacked straight from the mapped file, and array returns a
+        NumPy view of the whole file, so nothing is copied into Python first.
+    '''
+    def __init__(self, path: str):
+        self.file = open(path, 'rb')
+        size = os.fstat(self.file.fileno()).st_size
+        # An empty file can't be mapped, and a partial record at the end is ignored.
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        self.count = size // RECORD.size
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, n: int) -> tuple:
+        ''' Unpack record n as (player cards, dealer cards, wager, hits, winner, money). '''
+        if not 0 <= n < self.count:
+            raise IndexError('record index out of range')
+        return RECORD.unpack_from(self.map, n * RECORD.size)
+
+    def __iter__(self):
+        ''' Iterate the records in the order they were played. '''
+        return RECORD.iter_unpack(memoryview(self.map)[:self.count * RECORD.size])
+
+    def array(self) -> np.ndarray:
+        ''' View every record as a NumPy structured array backed by the memory map.
+            The array stays usable after close: the map is then closed once the array is garbage-collected.
+            Copy it to keep the records without keeping the map.
+        '''
+        return np.frombuffer(self.map, dtype=DTYPE, count=self.count)
+
+    def close(self):
+        ''' Close the file. The map is closed now, unless an array still views it. '''
+        if isinstance(self.map, mmap.mmap):
+            try:
+                self.map.close()
+            except BufferError:
+                # An array from array() still views the map. Dropping the reference
+                # lets the map be closed when the last array is garbage-collected.
+                pass
+            self.map = b''
+            self.count = 0
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def rescore(records: np.ndarray) -> tuple:
+    ''' Score the player and dealer hands of a structured array of records with score_batch.
+
+        Returns two arrays of totals. Filter first to rescore a subset, for example
+        rescore(records[records['wager'] > 100]).
+        >>> records = np.zeros(1, dtype=DTYPE)
+        >>> records['player'][0, :2] = [1, 14]
+        >>> records['dealer'][0, :3] = [10, 11, 12]
+        >>> rescore(records)
+        (array([12], dtype=int16), array([30], dtype=int16))
+    '''
+    return score_batch(_rank_codes(records['player'])), score_batch(_rank_codes(records['dealer']))
+
+def _rank_codes(cards: np.ndarray) -> np.ndarray:
+    ''' Convert stored card bytes to the rank codes used by score_batch, keeping 0 as padding. '''
+    return np.where(cards > 0, (cards.astype(np.int16) - 1) % 13 + 1, 0)
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(optionflags=doctest.IGNORE_EXCEPTION_DETAIL)
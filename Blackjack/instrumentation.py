@@ -0,0 +1,151 @@
+# Per-step timing for play_round.
+#
+# play_round is split into numbered steps. Passing an Instrumentation to
+# play_round (or play_round_async) records how often each step runs and how
+# long it takes. When no instrumentation is passed play_round only checks for
+# None, so there is no timing cost.
+#
+#  -----------------------------------------------------
+# | step      | play_round                              |
+#  -----------------------------------------------------
+# | betting   | STEP 1 and 2, waiting for the bet       |
+# | dealing   | STEP 3, including the first render      |
+# | actions   | STEP 4, waiting for hit or stand        |
+# | dealer    | STEP 5, the dealer's loop               |
+# | scoring   | STEP 6, scoring and settling the wager  |
+# | reveal    | STEP 7 and 8, the last render           |
+# | rendering | every render, also part of its step     |
+#  -----------------------------------------------------
+#
+# Rendering overlaps the dealing, actions and reveal steps: a render's time is
+# counted both on its own and in the step it happens in, so don't add it to the
+# other steps. export() lists that overlap under 'overlaps'.
+#
+# play_round_async doesn't render and doesn't count the time spent waiting for
+# the client in its steps: Timer.pause and Timer.resume record it as 'waiting'.
+import time
+
+class Instrumentation:
+    ''' Counters and histograms of the time spent in each step.
+
+        Histogram buckets double in size: bucket n holds durations below 2**n microseconds.
+        >>> instrumentation = Instrumentation()
+        >>> instrumentation.record('dealer', 0.000003)
+        >>> instrumentation.record('dealer', 0.000100)
+        >>> instrumentation.export()['counters']
+        {'dealer': {'count': 2, 'seconds': 0.000103}}
+        >>> instrumentation.export()['histograms']
+        {'dealer': {4: 1, 128: 1}}
+    '''
+    # Steps whose time is also counted in other steps.
+    OVERLAPS = {'rendering': ['dealing', 'actions', 'reveal']}
+
+    def __init__(self):
+        self.counts = {}
+        self.seconds = {}
+        self.histograms = {}
+
+    def record(self, step: str, seconds: float):
+        ''' Count one run of a step that took the provided number of seconds. '''
+        self.counts[step] = self.counts.get(step, 0) + 1
+        self.seconds[step] = self.seconds.get(step, 0.0) + seconds
+        bucket = int(seconds * 1e6).bit_length()
+        histogram = self.histograms.setdefault(step, {})
+        histogram[bucket] = histogram.get(bucket, 0) + 1
+
+    def timer(self) -> 'Timer':
+        ''' Start timing the steps of a round. '''
+        return Timer(self)
+
+    def export(self) -> dict:
+        ''' Return the counters and histograms. Histograms map a bucket's upper bound in µs to a count.
+            Overlaps map a recorded step to the steps that already include its time.
+
+            >>> instrumentation = Instrumentation()
+            >>> instrumentation.record('rendering', 0.000010)
+            >>> instrumentation.export()['overlaps']
+            {'rendering': ['dealing', 'actions', 'reveal']}
+        '''
+        return {
+            'counters': {step: {'count': self.counts[step], 'seconds': round(self.seconds[step], 9)}
+                         for step in self.counts},
+            'histograms': {step: {2 ** bucket: count for bucket, count in sorted(histogram.items())}
+                           for step, histogram in self.histograms.items()},
+            'overlaps': {step: steps for step, steps in self.OVERLAPS.items() if step in self.counts},
+        }
+
+    def percentile(self, step: str, fraction: float) -> float:
+        ''' Estimate a percentile of a step's duration in µs from its histogram's bucket bounds.
+
+            >>> instrumentation = Instrumentation()
+            >>> for _ in range(99): instrumentation.record('actions', 0.000010)
+            >>> instrumentation.record('actions', 0.001)
+            >>> instrumentation.percentile('actions', 0.5), instrumentation.percentile('actions', 0.999)
+            (16, 1024)
+        '''
+        histogram = self.histograms.get(step, {})
+        target = fraction * sum(histogram.values())
+        seen = 0
+        for bucket, count in sorted(histogram.items()):
+            seen += count
+            if seen >= target:
+                return 2 ** bucket
+        return 0
+
+    def prometheus(self, prefix='blackjack') -> str:
+        ''' Render the histograms in the Prometheus text format, with bounds in seconds. '''
+        lines = [f'# TYPE {prefix}_step_seconds histogram']
+        for step, histogram in self.histograms.items():
+            cumulative = 0
+            for bucket, count in sorted(histogram.items()):
+                cumulative += count
+                lines.append(f'{prefix}_step_seconds_bucket{{step="{step}",le="{2 ** bucket / 1e6:g}"}} {cumulative}')
+            lines.append(f'{prefix}_step_seconds_bucket{{step="{step}",le="+Inf"}} {cumulative}')
+            lines.append(f'{prefix}_step_seconds_sum{{step="{step}"}} {self.seconds[step]:.9f}')
+            lines.append(f'{prefix}_step_seconds_count{{step="{step}"}} {self.counts[step]}')
+        return '\n'.join(lines)
+
+    def __str__(self):
+        ''' One line per step with its count, mean and estimated p50 and p99. '''
+        lines = []
+        for step, count in self.counts.items():
+            mean = self.seconds[step] / count * 1e6
+            lines.append(f'{step:<10} count: {count:>10,} | mean: {mean:>10,.1f}µs | '
+                         f'p50: <{self.percentile(step, 0.5):,}µs | p99: <{self.percentile(step, 0.99):,}µs')
+        return '\n'.join(lines)
+
+class Timer:
+    ''' Times consecutive steps of one round. Each lap records the time since the previous one,
+        except the time between pause and resume, which is recorded as 'waiting'.
+
+        >>> instrumentation = Instrumentation()
+        >>> timer = instrumentation.timer()
+        >>> timer.pause(); time.sleep(0.01); timer.resume()
+        >>> timer.lap('betting')
+        >>> instrumentation.seconds['waiting'] > 0.01 > instrumentation.seconds['betting']
+        True
+    '''
+    def __init__(self, instrumentation: Instrumentation):
+        self.instrumentation = instrumentation
+        self.last = time.perf_counter()
+        self.paused = None
+
+    def pause(self):
+        ''' Stop counting time in the current step, e.g. while waiting for a client. '''
+        self.paused = time.perf_counter()
+
+    def resume(self):
+        ''' Record the time since pause as 'waiting' and leave it out of the current step. '''
+        waited = time.perf_counter() - self.paused
+        self.instrumentation.record('waiting', waited)
+        self.last += waited
+        self.paused = None
+
+    def lap(self, step: str):
+        now = time.perf_counter()
+        self.instrumentation.record(step, now - self.last)
+        self.last = now
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(optionflags=doctest.IGNORE_EXCEPTION_DETAIL)
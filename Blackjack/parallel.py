@@ -0,0 +1,67 @@
+# Multi-core blackjack simulation.
+#
+# The hands are split into fixed-size chunks and each chunk is simulated by a
+# process in a pool. Every chunk gets its own random streams seeded from the
+# run's seed and the chunk's index. Since the chunks don't depend on how many
+# workers there are, the same seed always produces the same totals.
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from cards import Deck
+from shuffles import ShuffleProvider
+from simulation import Report, Strategy, simulate
+
+# The number of hands each task simulates.
+# Large enough that the cost of sending a task to a worker is negligible.
+CHUNK_SIZE = 10_000
+
+def chunk_rng(seed: int, chunk: int) -> random.Random:
+    ''' Create the independent random stream for one chunk of a run.
+
+        String seeds are hashed by random.Random, so neighbouring chunks get unrelated streams.
+        >>> chunk_rng(7, 0).random() == chunk_rng(7, 0).random()
+        True
+        >>> chunk_rng(7, 0).random() == chunk_rng(7, 1).random()
+        False
+    '''
+    return random.Random(f'{seed}:{chunk}')
+
+def simulate_chunk(seed: int, chunk: int, hands: int, strategy: Strategy) -> Report:
+    ''' Simulate one chunk of hands with a fresh player and a deck using the chunk's random streams.
+        Full decks are shuffled from a batch of pre-shuffled decks seeded the same way.
+    '''
+    deck = Deck(chunk_rng(seed, chunk), ShuffleProvider(seed=[seed, chunk]))
+    return Report(simulate(hands, strategy, deck))
+
+def simulate_parallel(hands: int, seed: int = 0, strategy: Strategy = None, workers: int = None) -> Report:
+    ''' Simulate hands across a pool of processes and merge the per-chunk reports.
+
+        Args:
+            hands       | The total number of hands to play.
+            seed        | The seed of the run. Identical seeds give identical reports.
+            strategy    | (optional) The strategy used by every player. Must be picklable.
+            workers     | (optional) The number of processes. Defaults to the number of cores.
+
+        Every chunk starts with a new player, so bankruptcy in one chunk doesn't end the run.
+        >>> one = simulate_parallel(25_000, seed=1, workers=1)
+        >>> two = simulate_parallel(25_000, seed=1, workers=2)
+        >>> (one.hands, one.net) == (two.hands, two.net)
+        True
+    '''
+    strategy = strategy or Strategy()
+    workers = workers or os.cpu_count() or 1
+    # Chunk sizes only depend on the number of hands, never on the number of workers.
+    sizes = [min(CHUNK_SIZE, hands - start) for start in range(0, hands, CHUNK_SIZE)]
+    chunks = range(len(sizes))
+
+    report = Report()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # map returns results in chunk order, so merging is deterministic as well.
+        for chunk_report in pool.map(simulate_chunk, [seed] * len(sizes), chunks, sizes, [strategy] * len(sizes)):
+            report.merge(chunk_report)
+    return report
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(optionflags=doctest.IGNORE_EXCEPTION_DETAIL)
@@ -0,0 +1,112 @@
+# Exact dealer outcome probabilities.
+#
+# A simulation only estimates how often the dealer busts. This module computes
+# the exact probabilities by following dealer_turn's rule, hit while the score
+# is below 17, through every card the dealer could draw.
+#
+# The remaining cards are described by their composition: a tuple with the
+# number of cards left of each point value. Suits don't matter to blackjack and
+# 10, J, Q and K are all worth 10, so there are only ten kinds of card.
+#  -------------------------------------------------
+# | index |  0  1  2  3  4  5  6  7  8  9            |
+# | value |  A  2  3  4  5  6  7  8  9  10 J Q K     |
+#  -------------------------------------------------
+from functools import lru_cache
+
+from cards import Card, Deck
+
+# The outcomes of the dealer's hand, in the order the probabilities are returned.
+OUTCOMES = (17, 18, 19, 20, 21, 'bust')
+BUST = len(OUTCOMES) - 1
+
+# The composition index of each card code. Codes repeat every 13 cards, once per suit.
+_INDEX = [min(code % 13, 9) for code in range(52)]
+
+# The maximum number of entries in the dealer outcome cache.
+# Least recently used compositions are dropped once it's full.
+CACHE_SIZE = 1 << 20
+
+def composition(codes) -> tuple:
+    ''' Count the cards of each point value in a sequence of card codes, such as deck.codes.
+
+        >>> composition(Deck().codes)
+        (4, 4, 4, 4, 4, 4, 4, 4, 4, 16)
+    '''
+    counts = [0] * 10
+    for code in codes:
+        counts[_INDEX[code]] += 1
+    return tuple(counts)
+
+def index(card: Card) -> int:
+    ''' Return the composition index of a card.
+
+        >>> index(Card('♠', 'A')), index(Card('♦', '9')), index(Card('♥', 'Q'))
+        (0, 8, 9)
+    '''
+    return _INDEX[card.code]
+
+def dealer_distribution(upcard: int, remaining: tuple) -> tuple:
+    ''' Return the probability of each of the dealer's OUTCOMES.
+
+        Args:
+            upcard      | The composition index of the dealer's face up card.
+            remaining   | The composition of the cards the dealer will draw from.
+                        |> The upcard must already be removed from it.
+
+        The hole card is drawn from the remaining cards, so it's included in the distribution.
+        >>> deck = composition(Deck().codes)
+        >>> six = tuple(count - (i == 5) for i, count in enumerate(deck))
+        >>> [round(p, 4) for p in dealer_distribution(5, six)]
+        [0.1669, 0.1065, 0.1072, 0.1007, 0.0979, 0.4208]
+        >>> round(sum(dealer_distribution(0, deck)), 10)
+        1.0
+    '''
+    if upcard == 0:
+        return _outcomes(1, True, remaining)
+    return _outcomes(upcard + 1, False, remaining)
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _outcomes(hard: int, has_ace: bool, remaining: tuple) -> tuple:
+    ''' The distribution of outcomes for a dealer holding cards worth hard points, counting aces as 1.
+
+        The arguments form the cache key. Compositions are tuples, so equal shoes share entries.
+    '''
+    # Exactly one ace is counted as 11 whenever that doesn't bust the hand, the same as score().
+    total = hard + 10 if has_ace and hard <= 11 else hard
+    if total > 21:
+        return _FINAL[BUST]
+    if total >= 17:
+        return _FINAL[total - 17]
+
+    cards = sum(remaining)
+    if not cards:
+        raise ValueError('the dealer ran out of cards.')
+
+    distribution = [0.0] * len(OUTCOMES)
+    counts = list(remaining)
+    for value, count in enumerate(remaining):
+        if not count:
+            continue
+        # Draw a card of this value and recurse with it removed from the shoe.
+        counts[value] -= 1
+        drawn = _outcomes(hard + value + 1, has_ace or value == 0, tuple(counts))
+        counts[value] += 1
+        weight = count / cards
+        for outcome, probability in enumerate(drawn):
+            distribution[outcome] += weight * probability
+    return tuple(distribution)
+
+# The distribution of a dealer who has already finished, one per outcome.
+_FINAL = [tuple(float(i == outcome) for i in range(len(OUTCOMES))) for outcome in range(len(OUTCOMES))]
+
+def cache_info():
+    ''' Report the hits, misses and size of the dealer outcome cache. '''
+    return _outcomes.cache_info()
+
+def cache_clear():
+    ''' Empty the dealer outcome cache. '''
+    _outcomes.cache_clear()
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(optionflags=doctest.IGNORE_EXCEPTION_DETAIL)
@@ -0,0 +1,245 @@
+# Asyncio blackjack server hosting many independent tables.
+#
+# Every connection gets its own table: a player, a dealer and a shoe.
+# The round is played by play_round_async, which follows the same steps as
+# play_round but awaits the player's bets and actions from the connection.
+#
+# The protocol is line based. Lines starting with '? ' are prompts that
+# expect a single line in reply, everything else is for display:
+#    -------------------------------------------
+#   |     prompt      |          reply          |
+#    -------------------------------------------
+#   | ? bet <money>   | the wager, such as 10   |
+#   | ? action <total>| h to hit or s to stand  |
+#    -------------------------------------------
+# A line starting with '! ' ends the session, for example when the player is bankrupt.
+import asyncio
+import time
+
+from blackjack import GameOver, Player, dealer_turn, format_cards, format_winner, score, settle
+from cards import Shoe
+from instrumentation import Instrumentation
+
+async def play_round_async(player: Player, dealer: Player, deck, action_callable, bet_callable, send, instrumentation=None):
+    ''' Play a single round of blackjack with awaitable callables.
+
+        Args:
+            action_callable | Awaitable callable with the same contract as play_round's action_callable.
+            bet_callable    | Awaitable callable with the same contract as play_round's bet_callable.
+            send            | Awaitable callable that displays a str to the player.
+            instrumentation | (optional) An Instrumentation that records the time spent in each step.
+
+        >>> async def act(prompt): return 's'
+        >>> async def bet(money): return 100
+        >>> async def send(text): print(text)
+        >>> from cards import Card, Deck
+        >>> player, dealer, deck = Player(), Player(), Deck()
+        >>> deck.cards = [Card('♠', 'K'), Card('♠', 'A'), Card('♥', 'K'), Card('♥', 'Q')]
+        >>> asyncio.run(play_round_async(player, dealer, deck, act, bet, send)) # doctest: +NORMALIZE_WHITESPACE
+        -------------------------------------dealer-------------------------------------
+        Q♥ ??
+        -------------------------------------player-------------------------------------
+        A♠ K♠
+                                           total: 21
+        -------------------------------------dealer-------------------------------------
+        Q♥ K♥
+        -------------------------------------player-------------------------------------
+        A♠ K♠
+                                           total: 21
+        @@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@Player wins!@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@
+        >>> player.money, len(deck)
+        (1200, 4)
+    '''
+    timer = instrumentation.timer() if instrumentation is not None else None
+
+    async def wait(awaitable):
+        # Time spent waiting for the client is recorded as 'waiting', not in the current step.
+        if not timer:
+            return await awaitable
+        timer.pause()
+        try:
+            return await awaitable
+        finally:
+            timer.resume()
+
+    # STEP 1
+    if player.money == 0:
+        raise GameOver("Game over! You're bankrupt!")
+    dealer.cards = []
+    player.cards = []
+
+    # STEP 2
+    while (rounds_wager := await wait(bet_callable(player.money))) > player.money:
+        await wait(send(f'please change your bet. you bet ${rounds_wager}. you only have ${player.money}.'))
+    if timer:
+        timer.lap('betting')
+
+    # STEP 3
+    dealer.cards = [deck.deal(), deck.deal(faceup=False)]
+    player.cards = [deck.deal() for _ in range(2)]
+    await wait(send(format_cards(player, dealer)))
+    if timer:
+        timer.lap('dealing')
+
+    # STEP 4
+    while (action := await wait(action_callable('pick your action: (h)it (s)tand > '))) != 's':
+        if action == 'h':
+            player.cards.append(deck.deal())
+            await wait(send(format_cards(player, dealer)))
+    if timer:
+        timer.lap('actions')
+
+    # STEP 5
+    dealer_turn(dealer, deck)
+    if timer:
+        timer.lap('dealer')
+
+    # STEP 6
+    winner = settle(player, dealer, rounds_wager)
+    if timer:
+        timer.lap('scoring')
+
+    # STEP 7
+    for card in dealer.cards:
+        deck.reveal(card)
+    await wait(send(format_cards(player, dealer) + '\n' + format_winner(winner)))
+
+    # STEP 8
+    deck.return_cards(player.cards)
+    deck.return_cards(dealer.cards)
+    if timer:
+        timer.lap('reveal')
+
+def percentile(values: list, fraction: float) -> float:
+    ''' Return the value below which the provided fraction of the sorted values fall.
+
+        >>> percentile([5, 1, 4, 2, 3], 0.5), percentile(list(range(100)), 0.99)
+        (3, 99)
+    '''
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+class Stats:
+    ''' Collects action latencies and completed hands for the periodic report.
+
+        The latency of an action is the time the server takes between receiving a
+        reply and sending the next prompt, which includes playing out the round.
+        With profile set, the time spent in each step of the round is reported as well.
+    '''
+    def __init__(self, profile=False):
+        self.tables = 0
+        self.profile = profile
+        self.reset()
+
+    def reset(self):
+        ''' Start a new reporting window. '''
+        self.latencies = []
+        self.hands = 0
+        self.instrumentation = Instrumentation() if self.profile else None
+        self.started = time.perf_counter()
+
+    def report(self) -> str:
+        ''' Summarize the current window and start a new one. '''
+        elapsed = time.perf_counter() - self.started
+        summary = f'tables: {self.tables} | hands/s: {self.hands / elapsed:,.0f}'
+        if self.latencies:
+            summary += (f' | action p50: {percentile(self.latencies, 0.5) * 1e6:,.0f}µs'
+                        f' | action p99: {percentile(self.latencies, 0.99) * 1e6:,.0f}µs')
+        if self.instrumentation is not None and self.instrumentation.counts:
+            summary += '\n' + str(self.instrumentation)
+        self.reset()
+        return summary
+
+class Table:
+    ''' A single table serving one connection. '''
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, stats: Stats):
+        self.reader = reader
+        self.writer = writer
+        self.stats = stats
+        self.player = Player()
+        self.dealer = Player()
+        self.shoe = Shoe()
+        # When the last reply was received. Used to measure the action latency.
+        self.received = None
+
+    async def send(self, text: str):
+        self.writer.write(text.encode() + b'\n')
+        await self.writer.drain()
+
+    async def prompt(self, text: str) -> str:
+        ''' Send a prompt and wait for the reply. '''
+        if self.received is not None:
+            self.stats.latencies.append(time.perf_counter() - self.received)
+        await self.send(f'? {text}')
+        line = await self.reader.readline()
+        if not line:
+            raise ConnectionError('the player left the table.')
+        self.received = time.perf_counter()
+        return line.decode().strip()
+
+    async def bet(self, money: int) -> int:
+        ''' The awaitable equivalent of prompt_for_bet. '''
+        while True:
+            try:
+                return abs(int(await self.prompt(f'bet {money}')))
+            except ValueError:
+                await self.send('Your bet must be an integer. Example: 42')
+
+    async def action(self, _: str) -> str:
+        ''' Ask for an action. The prompt includes the player's total for bots. '''
+        return await self.prompt(f'action {score(self.player.cards)}')
+
+    async def play(self):
+        ''' Play rounds until the player leaves or goes bankrupt. '''
+        try:
+            while True:
+                if self.shoe.needs_shuffle:
+                    self.shoe.shuffle()
+                await play_round_async(self.player, self.dealer, self.shoe, self.action, self.bet, self.send,
+                                       self.stats.instrumentation)
+                self.stats.hands += 1
+        except GameOver as go:
+            await self.send(f'! {go}')
+        except ConnectionError:
+            pass
+        finally:
+            self.writer.close()
+
+async def serve(host='127.0.0.1', port=8021, interval=5.0, profile=False):
+    ''' Accept connections forever, printing a report every interval seconds. '''
+    stats = Stats(profile)
+
+    async def handle(reader, writer):
+        stats.tables += 1
+        try:
+            await Table(reader, writer, stats).play()
+        finally:
+            stats.tables -= 1
+
+    # A large backlog lets thousands of bots connect at once without being refused.
+    server = await asyncio.start_server(handle, host, port, backlog=4096)
+    print(f'serving blackjack on {host}:{port}')
+    async with server:
+        while True:
+            await asyncio.sleep(interval)
+            print(stats.report())
+
+if __name__ == '__main__':
+    import argparse
+    import doctest
+
+    parser = argparse.ArgumentParser(description='Host many blackjack tables.')
+    parser.add_argument('--test', action='store_true')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8021)
+    parser.add_argument('--interval', type=float, default=5.0, help='seconds between reports')
+    parser.add_argument('--profile', action='store_true', help='report the time spent in each step of a round')
+
+    args = parser.parse_args()
+    if args.test:
+        doctest.testmod(optionflags=doctest.IGNORE_EXCEPTION_DETAIL)
+    else:
+        try:
+            asyncio.run(serve(args.host, args.port, args.interval, args.profile))
+        except KeyboardInterrupt:
+            pass
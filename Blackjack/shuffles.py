@@ -0,0 +1,66 @@
+# Pre-generated shuffles for simulations.
+#
+# Shuffling with random.shuffle runs a Python level loop for every shuffle.
+# A ShuffleProvider instead fills a preallocated buffer with a large batch of
+# shuffled decks in one vectorized NumPy call, and a full deck or shoe simply
+# takes the next shuffled deck from the buffer.
+#
+# Each row is shuffled with NumPy's Fisher-Yates implementation, so every
+# order is equally likely, the same as random.shuffle.
+import numpy as np
+
+# The number of different card codes in a deck.
+DECK_SIZE = 52
+
+class ShuffleProvider:
+    ''' Hands out shuffled decks of card codes, generated in batches.
+
+        Args:
+            decks   | (optional) The number of decks shuffled together, 1 for a Deck or Shoe(decks).decks.
+            batch   | (optional) The number of shuffles generated at once.
+            seed    | (optional) The seed of the NumPy random generator.
+
+        >>> provider = ShuffleProvider(seed=7)
+        >>> shuffled = provider.take()
+        >>> sorted(shuffled) == list(range(52))
+        True
+        >>> ShuffleProvider(seed=7).take() == shuffled
+        True
+
+        Every card is equally likely to end up in every position.
+        >>> provider = ShuffleProvider(batch=1_000, seed=1)
+        >>> counts = np.zeros((52, 52), dtype=int)
+        >>> for _ in range(52_000):
+        ...     counts[np.frombuffer(provider.take(), dtype=np.uint8), np.arange(52)] += 1
+        >>> bool((abs(counts - 1_000) < 160).all())
+        True
+    '''
+    def __init__(self, decks: int = 1, batch: int = 4096, seed=None):
+        self.size = DECK_SIZE * decks
+        self.rng = np.random.default_rng(seed)
+        # The unshuffled cards: every deck contributes the codes 0 to 51 once.
+        self.deck = (np.arange(self.size) % DECK_SIZE).astype(np.uint8)
+        # The buffer is allocated once and reshuffled in place on every refill.
+        self.buffer = np.empty((batch, self.size), dtype=np.uint8)
+        self.data = b''
+        self.position = batch
+
+    def refill(self):
+        ''' Generate a new batch of shuffled decks into the buffer. '''
+        self.buffer[:] = self.deck
+        self.rng.permuted(self.buffer, axis=1, out=self.buffer)
+        # Handing out slices of one bytes object is cheaper than converting rows one at a time.
+        self.data = self.buffer.tobytes()
+        self.position = 0
+
+    def take(self) -> bytes:
+        ''' Return the codes of the next shuffled deck. '''
+        if self.position == len(self.buffer):
+            self.refill()
+        start = self.position * self.size
+        self.position += 1
+        return self.data[start:start + self.size]
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(optionflags=doctest.IGNORE_EXCEPTION_DETAIL)
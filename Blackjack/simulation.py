@@ -0,0 +1,192 @@
+# Headless blackjack simulation.
+#
+# play_round renders every action to the console, which is great for a person
+# but far too slow for evaluating the house edge over millions of hands.
+# This module plays the same steps as play_round without any rendering and
+# asks strategy objects, instead of a person, for bets and actions.
+from blackjack import GameOver, Player, dealer_turn, score, settle
+from cards import Card, Deck, Shoe
+from shuffles import ShuffleProvider
+
+class Strategy:
+    ''' A strategy decides how much to wager and whether to hit or stand.
+
+        The default strategy mimics the dealer: a flat bet and hit below 17.
+        Subclasses override bet and action to model other players.
+        >>> strategy = Strategy(wager=25)
+        >>> strategy.bet(1_000)
+        25
+        >>> strategy.bet(10)
+        10
+        >>> player = Player()
+        >>> player.cards = [Card('♠', '10'), Card('♠', '6')]
+        >>> strategy.action(player, Player())
+        'h'
+    '''
+    def __init__(self, wager=10, stand_on=17):
+        self.wager = wager
+        self.stand_on = stand_on
+
+    def bet(self, money: int) -> int:
+        ''' Return the wager for the next hand. Never bets more than the available money. '''
+        return min(self.wager, money)
+
+    def action(self, player: Player, dealer: Player) -> str:
+        ''' Return the symbol for the next action. Uses the same symbols as play_round: h or s. '''
+        return 'h' if score(player.cards) < self.stand_on else 's'
+
+class HandResult:
+    ''' The outcome of a single simulated hand.
+
+        __slots__ keeps these small since a simulation can produce millions of them.
+    '''
+    __slots__ = ('wager', 'player_score', 'dealer_score', 'winner', 'money')
+
+    def __init__(self, wager, player_score, dealer_score, winner, money):
+        self.wager = wager
+        self.player_score = player_score
+        self.dealer_score = dealer_score
+        self.winner = winner
+        # The player's money once the hand is settled.
+        self.money = money
+
+    def __repr__(self):
+        return (f'HandResult(wager={self.wager}, player_score={self.player_score}, '
+                f'dealer_score={self.dealer_score}, winner={self.winner!r}, money={self.money})')
+
+class Report:
+    ''' Aggregated statistics for a number of simulated hands.
+
+        >>> report = Report([HandResult(10, 20, 18, 'player', 1020), HandResult(10, 22, 18, 'dealer', 1010)])
+        >>> report.hands, report.wins, report.losses, report.wagered, report.net
+        (2, 1, 1, 20, 10)
+
+        Reports can be merged, which is how results from several simulations are combined.
+        >>> report.merge(Report([HandResult(5, 19, 20, 'dealer', 1005)]))
+        >>> report.hands, report.net
+        (3, 5)
+    '''
+    def __init__(self, results=()):
+        self.hands = 0
+        self.wins = 0
+        self.losses = 0
+        self.wagered = 0
+        self.net = 0
+        self.money = None
+        for result in results:
+            self.add(result)
+
+    def add(self, result: HandResult):
+        ''' Include a single hand in the report. '''
+        self.hands += 1
+        self.wagered += result.wager
+        # Payouts follow settle: a win pays double the wager and a loss costs the wager.
+        if result.winner == 'player':
+            self.wins += 1
+            self.net += result.wager * 2
+        else:
+            self.losses += 1
+            self.net -= result.wager
+        self.money = result.money
+
+    def merge(self, other: 'Report'):
+        ''' Combine the statistics of another report into this one. '''
+        self.hands += other.hands
+        self.wins += other.wins
+        self.losses += other.losses
+        self.wagered += other.wagered
+        self.net += other.net
+        if other.money is not None:
+            self.money = other.money
+
+    @property
+    def edge(self) -> float:
+        ''' The player's net result per unit wagered. Negative numbers favor the house. '''
+        return self.net / self.wagered if self.wagered else 0.0
+
+    def __str__(self):
+        return (f'hands: {self.hands} | wins: {self.wins} | losses: {self.losses} | '
+                f'wagered: ${self.wagered} | net: ${self.net} | edge: {self.edge:.4%}')
+
+def simulate_round(player: Player, dealer: Player, deck: Deck, strategy: Strategy, history=None) -> HandResult:
+    ''' Play a single round of blackjack without rendering anything.
+
+        Follows the same steps as play_round, with the strategy in place of
+        action_callable and bet_callable. The hand is recorded if a HistoryWriter is provided.
+        >>> player, dealer, deck = Player(), Player(), Deck()
+        >>> deck.cards = [Card('♠', 'K'), Card('♠', 'A'), Card('♥', 'K'), Card('♥', 'Q')]
+        >>> simulate_round(player, dealer, deck, Strategy(wager=100))
+        HandResult(wager=100, player_score=21, dealer_score=20, winner='player', money=1200)
+        >>> len(deck)
+        4
+    '''
+    # STEP 1
+    if player.money == 0:
+        raise GameOver("Game over! You're bankrupt!")
+
+    # STEP 2
+    # A strategy that bets too much would be asked again forever. Fail loudly instead.
+    rounds_wager = strategy.bet(player.money)
+    if rounds_wager > player.money:
+        raise ValueError(f'strategy bet ${rounds_wager} but the player only has ${player.money}.')
+
+    # STEP 3
+    dealer.cards = [deck.deal(), deck.deal(faceup=False)]
+    player.cards = [deck.deal(), deck.deal()]
+
+    # STEP 4
+    hits = 0
+    while strategy.action(player, dealer) == 'h':
+        player.cards.append(deck.deal())
+        hits += 1
+
+    # STEP 5
+    dealer_turn(dealer, deck)
+
+    # STEP 6
+    winner = settle(player, dealer, rounds_wager)
+    if history is not None:
+        history.record(player, dealer, rounds_wager, hits, winner)
+
+    # STEP 7 has nothing to display, but card counters still see the hole card.
+    for card in dealer.cards:
+        deck.reveal(card)
+    # STEP 8
+    deck.return_cards(player.cards)
+    deck.return_cards(dealer.cards)
+    return HandResult(rounds_wager, score(player.cards), score(dealer.cards), winner, player.money)
+
+def simulate(hands: int, strategy: Strategy = None, deck: Deck = None, player: Player = None, history=None):
+    ''' Play up to the provided number of hands, yielding a HandResult for each.
+
+        The deck is shuffled whenever it needs to be, the same as play does.
+        A Deck is shuffled before every hand while a Shoe waits for its cut card.
+        The simulation stops early if the player goes bankrupt.
+        >>> results = list(simulate(100))
+        >>> len(results) <= 100
+        True
+        >>> all(result.wager == 10 for result in results)
+        True
+        >>> len(list(simulate(100, deck=Shoe(decks=2)))) <= 100
+        True
+    '''
+    strategy = strategy or Strategy()
+    # Decks and shoes define __len__, so an empty one is falsy: compare with None instead.
+    if deck is None:
+        # A Deck is shuffled before every hand, which costs more than playing it.
+        # Pre-generated shuffles make that shuffle about ten times cheaper.
+        deck = Deck(shuffler=ShuffleProvider())
+    if player is None:
+        player = Player()
+    dealer = Player()
+    for _ in range(hands):
+        if deck.needs_shuffle:
+            deck.shuffle()
+        try:
+            yield simulate_round(player, dealer, deck, strategy, history)
+        except GameOver:
+            return
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(optionflags=doctest.IGNORE_EXCEPTION_DETAIL)
@@ -0,0 +1,280 @@
+# Expected values and composition dependent strategy tables.
+#
+# Builds on the exact dealer probabilities to answer: for this hand, this
+# upcard and these remaining cards, is hitting or standing worth more?
+# The answers are computed for the rules of this game as implemented by settle:
+#   a win pays double the wager, a loss costs the wager,
+#   21 always wins, a dealer bust always wins and ties go to the player.
+import json
+from functools import lru_cache
+
+import numpy as np
+
+from blackjack import Player
+from cards import Card, Deck, Shoe
+from probability import BUST, OUTCOMES, composition, dealer_distribution, index
+from simulation import Strategy
+
+# Column labels for the upcards of a strategy table, in composition index order.
+UPCARDS = 'A 2 3 4 5 6 7 8 9 10'.split()
+
+def total(hard: int, has_ace: bool) -> int:
+    ''' Return the score of a hand from its hard total and whether it holds an ace.
+
+        >>> total(11, True), total(12, True), total(16, False)
+        (21, 12, 16)
+    '''
+    return hard + 10 if has_ace and hard <= 11 else hard
+
+def stand_value(player_total: int, dealer: tuple) -> float:
+    ''' The expected value per unit wagered of standing on a total against a dealer distribution.
+
+        >>> stand_value(21, (0.2, 0.2, 0.2, 0.2, 0.2, 0.0))
+        2.0
+        >>> stand_value(16, (0.5, 0.0, 0.0, 0.0, 0.0, 0.5))
+        0.5
+    '''
+    if player_total == 21:
+        win = 1.0
+    else:
+        win = dealer[BUST]
+        if player_total <= 21:
+            win += sum(p for outcome, p in zip(OUTCOMES, dealer) if outcome != 'bust' and player_total >= outcome)
+    return 2 * win - (1 - win)
+
+@lru_cache(maxsize=None)
+def _dealer_hands(upcard: int) -> tuple:
+    ''' Enumerate every way the dealer's hand can finish for an upcard.
+
+        Returns three arrays with one row per distinct multiset of cards drawn by the dealer:
+        the count of each card value drawn, the number of orders those cards can be
+        drawn in with the dealer stopping only at the last one, and the outcome index.
+        None of this depends on the composition of the shoe, so it's computed once per upcard.
+    '''
+    hands = {}
+    def draw(hard, has_ace, drawn):
+        player_total = total(hard, has_ace)
+        if player_total >= 17:
+            outcome = BUST if player_total > 21 else player_total - 17
+            key = tuple(drawn)
+            orders, _ = hands.get(key, (0, outcome))
+            hands[key] = (orders + 1, outcome)
+            return
+        for value in range(10):
+            drawn[value] += 1
+            draw(hard + value + 1, has_ace or value == 0, drawn)
+            drawn[value] -= 1
+    draw(upcard + 1, upcard == 0, [0] * 10)
+    counts = np.array(list(hands), dtype=np.int64)
+    orders = np.array([orders for orders, _ in hands.values()], dtype=np.float64)
+    outcomes = np.array([outcome for _, outcome in hands.values()], dtype=np.int64)
+    return counts, orders, outcomes
+
+def _falling(n: int, k: int) -> np.ndarray:
+    ''' The falling factorials n * (n - 1) * ... * (n - j + 1) for every j from 0 to k. 
+
+        >>> _falling(4, 5)
+        array([ 1.,  4., 12., 24., 24.,  0.])
+    '''
+    return np.cumprod([1.0] + [max(n - j, 0) for j in range(k)])
+
+@lru_cache(maxsize=1 << 16)
+def _dealer(upcard: int, remaining: tuple) -> tuple:
+    ''' The same distribution as dealer_distribution, computed as a single vectorized sum.
+
+        The probability of drawing a particular sequence of cards only depends on how
+        many of each value it contains, so each finishing multiset contributes
+        orders * product of falling factorials of the counts / falling factorial of the shoe.
+        Unlike the recursion, nothing has to be recomputed when only the composition changes,
+        which is what the player's search needs.
+        >>> shoe = composition(Shoe(2).codes)
+        >>> all(np.allclose(_dealer(upcard, shoe), dealer_distribution(upcard, shoe)) for upcard in range(10))
+        True
+    '''
+    counts, orders, outcomes = _dealer_hands(upcard)
+    # The dealer never draws more than 11 cards, so the factorials stop there.
+    width = counts.shape[1]
+    numerators = np.array([_falling(count, 11) for count in remaining])
+    denominators = _falling(sum(remaining), 11)
+    weights = orders * numerators[np.arange(width), counts].prod(axis=1) / denominators[counts.sum(axis=1)]
+    return tuple(np.bincount(outcomes, weights=weights, minlength=len(OUTCOMES)).tolist())
+
+@lru_cache(maxsize=1 << 20)
+def _values(hard: int, has_ace: bool, upcard: int, remaining: tuple) -> tuple:
+    ''' Return the (stand, hit) expected values of a hand.
+
+        The cache key is the hand's totals, the upcard and the remaining composition.
+        The composition is the sorted multiset of cards still in the shoe, so every
+        order of drawing the same cards (a transposition) shares a single entry.
+    '''
+    stand = stand_value(total(hard, has_ace), _dealer(upcard, remaining))
+    # Hitting a bust hand or a 21 can never beat standing, so the search stops there.
+    if total(hard, has_ace) >= 21:
+        return stand, float('-inf')
+
+    cards = sum(remaining)
+    hit = 0.0
+    counts = list(remaining)
+    for value, count in enumerate(remaining):
+        if not count:
+            continue
+        counts[value] -= 1
+        after = _values(hard + value + 1, has_ace or value == 0, upcard, tuple(counts))
+        counts[value] += 1
+        hit += count / cards * max(after)
+    return stand, hit
+
+def hand_state(cards: list[Card]) -> tuple:
+    ''' Return a hand's hard total, counting aces as 1, and whether it holds an ace.
+
+        >>> hand_state([Card('♠', 'A'), Card('♠', '6')])
+        (7, True)
+    '''
+    indexes = [index(card) for card in cards]
+    return sum(indexes) + len(indexes), 0 in indexes
+
+def expected_values(hand: list[Card], upcard: Card, remaining: tuple) -> tuple:
+    ''' Return the (stand, hit) expected values per unit wagered for a hand.
+
+        Args:
+            hand        | The player's cards.
+            upcard      | The dealer's face up card.
+            remaining   | The composition of the cards left to draw from.
+                        |> The hand and the upcard must already be removed from it.
+
+        >>> deck = Deck()
+        >>> hand = [Card('♠', '10'), Card('♥', '6')]
+        >>> upcard = Card('♦', '10')
+        >>> remaining = composition(deck.codes[:9] + deck.codes[10:18] + deck.codes[19:48])
+        >>> stand, hit = expected_values(hand, upcard, remaining)
+        >>> hit > stand
+        True
+    '''
+    hard, has_ace = hand_state(hand)
+    return _values(hard, has_ace, index(upcard), remaining)
+
+def best_action(hand: list[Card], upcard: Card, remaining: tuple) -> str:
+    ''' Return 'h' or 's', whichever has the higher expected value. '''
+    stand, hit = expected_values(hand, upcard, remaining)
+    return 'h' if hit > stand else 's'
+
+def _starting_hands():
+    ''' Yield a representative two card hand for each row of a strategy table.
+
+        Each hand is (row label, hard total, has ace, composition indexes of the two cards).
+    '''
+    for hard in range(5, 21):
+        # Split the total into two non-ace cards, using the lowest first card that leaves a valid second card.
+        low = max(hard - 10, 2)
+        first, second = low, hard - low
+        yield f'hard {hard}', hard, False, (first - 1, second - 1)
+    for other in range(1, 11):
+        yield f'soft {other + 11}', other + 1, True, (0, other - 1)
+
+class BasicStrategy(Strategy):
+    ''' A strategy table giving the best action for every starting total against every upcard.
+
+        The table is computed for a full shoe, so it is the composition dependent
+        basic strategy for that number of decks. Tables can be saved as JSON and
+        loaded instantly.
+        >>> table = BasicStrategy.build(decks=1)
+        >>> table.lookup(16, False, 9), table.lookup(18, False, 5), table.lookup(20, True, 0)
+        ('h', 's', 's')
+        >>> BasicStrategy.loads(table.dumps()).rows == table.rows
+        True
+
+        It can play the simulation or drive play_round as an action_callable.
+        >>> player, dealer = Player(), Player()
+        >>> player.cards = [Card('♠', '10'), Card('♥', '6')]
+        >>> dealer.cards = [Card('♦', 'K'), Card('♣', '5', faceup=False)]
+        >>> table.action(player, dealer)
+        'h'
+        >>> table.action_callable(player, dealer)('pick your action: (h)it (s)tand > ')
+        'h'
+    '''
+    def __init__(self, rows: dict, decks: int, wager=10):
+        super().__init__(wager=wager)
+        # rows maps a label such as 'hard 16' or 'soft 18' to one action per upcard.
+        self.rows = rows
+        self.decks = decks
+
+    @classmethod
+    def build(cls, decks=6, wager=10):
+        ''' Compute the table for a shoe with the provided number of decks. '''
+        shoe = composition(Shoe(decks).codes)
+        rows = {}
+        for label, hard, has_ace, cards in _starting_hands():
+            actions = ''
+            for upcard in range(len(UPCARDS)):
+                remaining = list(shoe)
+                for card in (*cards, upcard):
+                    remaining[card] -= 1
+                stand, hit = _values(hard, has_ace, upcard, tuple(remaining))
+                actions += 'h' if hit > stand else 's'
+            rows[label] = actions
+        return cls(rows, decks, wager)
+
+    def lookup(self, hard: int, has_ace: bool, upcard: int) -> str:
+        ''' Return the action for a hand's totals against an upcard's composition index. '''
+        player_total = total(hard, has_ace)
+        if player_total >= 21:
+            return 's'
+        soft = has_ace and hard <= 11
+        # Hands of 4 can only be a pair of 2s, which plays like a hard 5.
+        label = f'soft {player_total}' if soft else f'hard {max(player_total, 5)}'
+        return self.rows[label][upcard]
+
+    def action(self, player: Player, dealer: Player) -> str:
+        ''' Return the table's action for the player's cards against the dealer's first card. '''
+        hard, has_ace = hand_state(player.cards)
+        return self.lookup(hard, has_ace, index(dealer.cards[0]))
+
+    def action_callable(self, player: Player, dealer: Player) -> callable:
+        ''' Return a callable usable as play_round's action_callable for these players. '''
+        return lambda prompt: self.action(player, dealer)
+
+    def dumps(self) -> str:
+        ''' Serialize the table as JSON. '''
+        return json.dumps({'decks': self.decks, 'upcards': UPCARDS, 'rows': self.rows}, indent=2)
+
+    @classmethod
+    def loads(cls, text: str, wager=10):
+        ''' Load a table serialized with dumps. '''
+        data = json.loads(text)
+        return cls(data['rows'], data['decks'], wager)
+
+    def save(self, path: str):
+        ''' Write the table to a JSON file. '''
+        with open(path, 'w') as file:
+            file.write(self.dumps())
+
+    @classmethod
+    def load(cls, path: str, wager=10):
+        ''' Read a table written by save. '''
+        with open(path) as file:
+            return cls.loads(file.read(), wager)
+
+    def __str__(self):
+        ''' Render the table with one column per upcard. '''
+        lines = [f'{"":>8} ' + ' '.join(f'{upcard:>2}' for upcard in UPCARDS)]
+        for label, actions in self.rows.items():
+            lines.append(f'{label:>8} ' + ' '.join(f'{action:>2}' for action in actions))
+        return '\n'.join(lines)
+
+if __name__ == '__main__':
+    import argparse
+    import doctest
+
+    parser = argparse.ArgumentParser(description='Build a blackjack strategy table.')
+    parser.add_argument('--test', action='store_true')
+    parser.add_argument('--decks', type=int, default=6)
+    parser.add_argument('--save', metavar='PATH', help='write the table to a JSON file')
+
+    args = parser.parse_args()
+    if args.test:
+        doctest.testmod(optionflags=doctest.IGNORE_EXCEPTION_DETAIL)
+    else:
+        table = BasicStrategy.build(args.decks)
+        print(table)
+        if args.save:
+            table.save(args.save)
@@ -1,32 +1,132 @@
+import mmap
+import os
+import string
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
 import art
 
-print(art.logo_caesar)
+#Size of the chunks read by the streaming mode
+CHUNK_SIZE = 1 << 20
+
+#Size of the ranges transformed by each task of the parallel mode.
+#Ranges start on a multiple of the mmap allocation granularity, as mmap offsets must.
+RANGE_SIZE = (16 << 20) // mmap.ALLOCATIONGRANULARITY * mmap.ALLOCATIONGRANULARITY
 
 alphabet = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i', 'j', 'k', 'l', 'm', 'n', 'o', 'p', 'q', 'r', 's', 't', 'u', 'v', 'w', 'x', 'y', 'z']
 
+#Translation tables are built once per (shift, method) and cached.
+#The key is normalised first, so there are at most 52 tables whatever shifts are asked for.
+#Lowercase and uppercase letters are shifted, everything else is left unchanged.
+def byte_table(shift, method):
+    return _byte_table(shift % 26, method == "encode")
+
+def text_table(shift, method):
+    return _text_table(shift % 26, method == "encode")
+
+@lru_cache(maxsize=None)
+def _byte_table(shift, encode):
+    if not encode:
+        shift = -shift % 26
+    lower = string.ascii_lowercase
+    upper = string.ascii_uppercase
+    source = (lower + upper).encode()
+    target = (lower[shift:] + lower[:shift] + upper[shift:] + upper[:shift]).encode()
+    return bytes.maketrans(source, target)
+
+@lru_cache(maxsize=None)
+def _text_table(shift, encode):
+    table = _byte_table(shift, encode)
+    return str.maketrans({chr(c): chr(table[c]) for c in range(128) if table[c] != c})
+
 def caesar(text,shift,method):
-    result=[]
-    for char in text :
-        if method == "encode":
-            p=alphabet.index(char) + shift % 26
-            if p > 25 :
-                p = p % 26
-            result.append(alphabet[p])
-        else:
-           p=alphabet.index(char) - shift % 26
-           if p < 0:
-                p= p + 26 
-           result.append(alphabet[p]) 
-    return ''.join(result)
-
-while(True):
-    method = input("Type 'encode' to encrypt, type 'decode' to decrypt:\n")
-    text = input("Type your message:\n").lower()
-    shift = int(input("Type the shift number:\n"))
-    print(caesar(text,shift,method))
-    continu = input("Type yes if you want to go again ")
-    if continu != "yes":
-        break
+    return text.translate(text_table(shift, method))
+
+def caesar_bytes(data,shift,method):
+    return data.translate(byte_table(shift, method))
+
+#Encode or decode a binary stream chunk by chunk, so any size uses the same memory.
+#Only ASCII letters change, and no byte of a multi-byte UTF-8 character is ASCII,
+#so chunks can be cut anywhere.
+def caesar_stream(source,destination,shift,method,chunk_size=CHUNK_SIZE):
+    table = byte_table(shift, method)
+    while chunk := source.read(chunk_size):
+        destination.write(chunk.translate(table))
+
+#Opening the output with "wb" empties it, so it must not be the input file.
+def check_paths(input_path,output_path):
+    if os.path.exists(output_path) and os.path.samefile(input_path, output_path):
+        raise ValueError(f"{output_path} is the input file, write to another file")
+
+def caesar_file(input_path,output_path,shift,method,chunk_size=CHUNK_SIZE):
+    check_paths(input_path, output_path)
+    with open(input_path, "rb") as source, open(output_path, "wb") as destination:
+        caesar_stream(source, destination, shift, method, chunk_size)
+
+#Transform one range of the input file straight into the same range of the output file.
+#Each worker maps its own range of both files, so only paths and offsets are sent to it.
+def caesar_range(input_path,output_path,start,length,shift,method):
+    with open(input_path, "rb") as source, open(output_path, "r+b") as destination:
+        with mmap.mmap(source.fileno(), length, offset=start, access=mmap.ACCESS_READ) as data, \
+             mmap.mmap(destination.fileno(), length, offset=start) as result:
+            result[:] = data[:].translate(byte_table(shift, method))
+    return length
+
+#Encode or decode a file with a process pool. The output file is preallocated to the
+#size of the input, split in page aligned ranges, and every range is written in place.
+def caesar_parallel(input_path,output_path,shift,method,workers=None,range_size=RANGE_SIZE):
+    if range_size % mmap.ALLOCATIONGRANULARITY:
+        raise ValueError(f"range_size must be a multiple of {mmap.ALLOCATIONGRANULARITY}")
+    check_paths(input_path, output_path)
+    size = os.path.getsize(input_path)
+    with open(output_path, "wb") as destination:
+        destination.truncate(size)
+        #Allocate the blocks now, so workers don't allocate them one page fault at a time
+        if size and hasattr(os, "posix_fallocate"):
+            os.posix_fallocate(destination.fileno(), 0, size)
+    if size == 0:
+        return
+    starts = range(0, size, range_size)
+    lengths = [min(range_size, size - start) for start in starts]
+    count = len(lengths)
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        #list() waits for every range and raises the first error of a worker
+        list(pool.map(caesar_range, [input_path] * count, [output_path] * count, starts, lengths,
+                      [shift] * count, [method] * count))
+
+if __name__ == "__main__" and len(sys.argv) > 1:
+    #Streaming mode: python Caeser_cipher.py encode 3 [input] [output], - or nothing for stdin/stdout
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Encode or decode a file or stdin with the Caesar cipher.")
+    parser.add_argument("method", choices=["encode", "decode"])
+    parser.add_argument("shift", type=int)
+    parser.add_argument("input", nargs="?", default="-")
+    parser.add_argument("output", nargs="?", default="-")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, help="transform files in parallel with this many processes, 0 for all cores")
+    args = parser.parse_args()
+
+    if args.workers is not None and "-" not in (args.input, args.output):
+        caesar_parallel(args.input, args.output, args.shift, args.method, args.workers or None)
+        sys.exit()
+    if "-" not in (args.input, args.output):
+        check_paths(args.input, args.output)
+    source = sys.stdin.buffer if args.input == "-" else open(args.input, "rb")
+    destination = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    with source, destination:
+        caesar_stream(source, destination, args.shift, args.method, args.chunk_size)
+elif __name__ == "__main__":
+    print(art.logo_caesar)
+    while(True):
+        method = input("Type 'encode' to encrypt, type 'decode' to decrypt:\n")
+        text = input("Type your message:\n").lower()
+        shift = int(input("Type the shift number:\n"))
+        print(caesar(text,shift,method))
+        continu = input("Type yes if you want to go again ")
+        if continu != "yes":
+            break
 
 
 
@@ -0,0 +1,131 @@
+# Finds the shift of a Caesar ciphertext without knowing it.
+#
+# The letters of the ciphertext are counted once. Decoding with a shift only
+# renames the letters, so the counts for all 26 shifts are rotations of that
+# single histogram, built at once with NumPy. Each shift is then scored with
+# the chi-squared distance between its letter counts and the letter
+# frequencies of a language: the lower the score, the more the decoded text
+# looks like that language.
+#
+#   python Caeser_cracker.py secret.txt            rank the shifts of a file
+#   python Caeser_cracker.py secret.txt --sample   only count letters in samples of a large file
+#   python Caeser_cracker.py < secret.txt          read the ciphertext from stdin
+import os
+import sys
+
+import numpy as np
+
+# Letter frequencies in percent, a to z. Accented French letters count as their base letter.
+FREQUENCIES = {
+    'english': np.array([8.167, 1.492, 2.782, 4.253, 12.702, 2.228, 2.015, 6.094, 6.966, 0.153,
+                         0.772, 4.025, 2.406, 6.749, 7.507, 1.929, 0.095, 5.987, 6.327, 9.056,
+                         2.758, 0.978, 2.360, 0.150, 1.974, 0.074]),
+    'french': np.array([7.636, 0.901, 3.260, 3.669, 14.715, 1.066, 0.866, 0.737, 7.529, 0.613,
+                        0.074, 5.456, 2.968, 7.095, 5.796, 2.521, 1.362, 6.693, 7.948, 7.244,
+                        6.311, 1.838, 0.049, 0.427, 0.128, 0.326]),
+}
+
+# Size of the chunks counted at once. np.bincount widens bytes to 8 bytes each,
+# so chunks keep that temporary array small.
+CHUNK_SIZE = 4 << 20
+
+# ROTATIONS[shift, letter] is the ciphertext letter that decodes to letter with that shift.
+ROTATIONS = (np.arange(26)[None, :] + np.arange(26)[:, None]) % 26
+
+def histogram(data) -> np.ndarray:
+    ''' Count the ASCII letters a to z of bytes, ignoring case.
+
+        >>> histogram(b'Abc, abz!')[[0, 1, 2, 25]]
+        array([2, 2, 1, 1])
+    '''
+    counts = np.bincount(np.frombuffer(data, dtype=np.uint8), minlength=256)
+    return counts[ord('a'):ord('z') + 1] + counts[ord('A'):ord('Z') + 1]
+
+def stream_histogram(stream, chunk_size: int = CHUNK_SIZE) -> np.ndarray:
+    ''' Count the letters of a binary stream chunk by chunk, in a single pass. '''
+    counts = np.zeros(26, dtype=np.int64)
+    while chunk := stream.read(chunk_size):
+        counts += histogram(chunk)
+    return counts
+
+def sample_histogram(path: str, samples: int = 64, sample_size: int = 1 << 20) -> np.ndarray:
+    ''' Count the letters of evenly spaced samples of a file instead of the whole file.
+        A few megabytes of text are enough to rank the shifts of any size of file.
+    '''
+    size = os.path.getsize(path)
+    if size <= samples * sample_size:
+        with open(path, 'rb') as file:
+            return stream_histogram(file)
+    counts = np.zeros(26, dtype=np.int64)
+    with open(path, 'rb') as file:
+        for start in np.linspace(0, size - sample_size, samples, dtype=np.int64):
+            file.seek(start)
+            counts += histogram(file.read(sample_size))
+    return counts
+
+def chi_squared(counts: np.ndarray) -> dict:
+    ''' Score every shift against every language.
+
+        Returns an array of 26 scores per language, indexed by shift. Lower is better.
+    '''
+    # shifted[shift] are the letter counts of the text decoded with that shift.
+    shifted = counts[ROTATIONS]
+    total = max(int(counts.sum()), 1)
+    scores = {}
+    for language, frequencies in FREQUENCIES.items():
+        expected = frequencies / frequencies.sum() * total
+        scores[language] = ((shifted - expected) ** 2 / expected).sum(axis=1)
+    return scores
+
+def rank(counts: np.ndarray) -> list:
+    ''' Return every (score, shift, language) candidate, the most likely first. '''
+    candidates = [(float(score), shift, language)
+                  for language, scores in chi_squared(counts).items()
+                  for shift, score in enumerate(scores)]
+    return sorted(candidates)
+
+def crack(ciphertext) -> list:
+    ''' Rank the shifts of a ciphertext, given as str or bytes.
+
+        The shift of a candidate is the one that was used to encode, so decode with it.
+        >>> from Caeser_cipher import caesar
+        >>> secret = caesar('The quick brown fox jumps over the lazy dog and then runs into the forest.', 7, 'encode')
+        >>> score, shift, language = crack(secret)[0]
+        >>> shift, language
+        (7, 'english')
+        >>> secret = caesar('Le petit chat dort sous la table pendant que les enfants jouent dehors.', 19, 'encode')
+        >>> crack(secret)[0][1:]
+        (19, 'french')
+    '''
+    if isinstance(ciphertext, str):
+        ciphertext = ciphertext.encode()
+    return rank(histogram(ciphertext))
+
+def crack_file(path: str, sample: bool = False) -> list:
+    ''' Rank the shifts of a file, streaming it or only reading samples of it. '''
+    if sample:
+        return rank(sample_histogram(path))
+    with open(path, 'rb') as file:
+        return rank(stream_histogram(file))
+
+if __name__ == '__main__':
+    import argparse
+    import doctest
+
+    parser = argparse.ArgumentParser(description='Find the shift of a Caesar ciphertext.')
+    parser.add_argument('input', nargs='?', default='-', help='the ciphertext file, - for stdin')
+    parser.add_argument('--sample', action='store_true', help='only count letters in samples of the file')
+    parser.add_argument('--top', type=int, default=3, help='the number of candidates to print')
+    parser.add_argument('--test', action='store_true')
+
+    args = parser.parse_args()
+    if args.test:
+        doctest.testmod(optionflags=doctest.IGNORE_EXCEPTION_DETAIL)
+        sys.exit()
+
+    if args.input == '-':
+        candidates = rank(stream_histogram(sys.stdin.buffer))
+    else:
+        candidates = crack_file(args.input, args.sample)
+    for score, shift, language in candidates[:args.top]:
+        print(f'shift {shift:>2} | {language:<8} | chi-squared {score:,.1f}')
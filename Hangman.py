@@ -1,5 +1,7 @@
 import random
-# from replit import clear
+import sys
+from terminal import clear
+from wordfile import load_pool
 
 stages = ['''
   +---+
@@ -62,38 +64,55 @@ lives= 6
 
 word_list=["camel","football","airplain"]
 
-end_of_game= False
+def ask_letter(word_guess):
+  return input("Guess a letter: ").lower()
 
-word_guess=[]
+#Play one game. guess_callable receives the word guess in this format :_ _ _ _
+#and returns a letter, so the game can be played by a person or a program.
+def play(word, guess_callable=ask_letter, lives=lives, display=True):
+  end_of_game= False
 
-#Choose radom word for word_list
-word=random.choice(word_list)
-print(word)
+  word_guess=[]
 
-#Word guess in this format :_ _ _ _ 
-for char in word:
-    word_guess.append("_")
+  #Word guess in this format :_ _ _ _ 
+  for char in word:
+      word_guess.append("_")
 
+  while not end_of_game:
+    char_guess=guess_callable(word_guess)
+    if display:
+      clear()
 
+    for pos in range(len(word)):
+        if char_guess == word[pos]:
+            word_guess[pos]=char_guess
 
-while not end_of_game:
-  char_guess=input("Guess a letter: ").lower()
-  # clear()
+    if display:
+      print(f"{' '.join(word_guess)}")
 
-  for pos in range(len(word)):
-      if char_guess == word[pos]:
-          word_guess[pos]=char_guess
-  
-  print(f"{' '.join(word_guess)}")
+    if char_guess not in word_guess:
+      lives -= 1
+      if display:
+        print(stages[lives])
+      if lives == 0 :
+        end_of_game= True
+        if display:
+          print("GAME OVER")
 
-  if char_guess not in word_guess:
-    lives -= 1
-    print(stages[lives])
-    if lives == 0 :
+    if "_" not in word_guess:
       end_of_game= True
-      print("GAME OVER")
-  
-  if "_" not in word_guess:
-    end_of_game= True
-    print("YOU WIN")
+      if display:
+        print("YOU WIN")
 
+  return "_" not in word_guess
+
+if __name__ == "__main__":
+  #Choose radom word for word_list, or from a word file (plain, .gz, .bz2 or .xz)
+  #given on the command line. The words sampled from a file are cached next to it.
+  if len(sys.argv) > 1:
+    word=random.choice(load_pool(sys.argv[1], cache_path=sys.argv[1] + ".pool"))
+  else:
+    word=random.choice(word_list)
+  print(word)
+
+  play(word)
@@ -3,26 +3,31 @@ letters = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i', 'j', 'k', 'l', 'm', 'n',
 numbers = ['0', '1', '2', '3', '4', '5', '6', '7', '8', '9']
 symbols = ['!', '#', '$', '%', '&', '(', ')', '*', '+']
 
-print("Welcome to the PyPassword Generator!")
-nr_letters= int(input("How many letters would you like in your password?\n")) 
-nr_symbols = int(input(f"How many symbols would you like?\n"))
-nr_numbers = int(input(f"How many numbers would you like?\n"))
+def generate_password(nr_letters, nr_symbols, nr_numbers):
+    password_list=[]
 
-password_list=[]
+    for char in range(1,nr_letters+1):
+        password_list.append(random.choice(letters))
 
-for char in range(1,nr_letters+1):
-    password_list.append(random.choice(letters))
+    for char in range(1,nr_numbers+1):
+        password_list.append(random.choice(numbers))
 
-for char in range(1,nr_numbers+1):
-    password_list.append(random.choice(numbers))
+    for char in range(1,nr_symbols):
+        password_list.append(random.choice(symbols))
 
-for char in range(1,nr_symbols):
-    password_list.append(random.choice(symbols))
+    #Reorder a List
+    random.shuffle(password_list)
 
-#Reorder a List
-random.shuffle(password_list)
+    password=""
+    for char in password_list:
+        password += char
+    return password
 
-password=""
-for char in password_list:
-    password += char
-print(f"Your password is: {password}")
\ No newline at end of file
+if __name__ == "__main__":
+    print("Welcome to the PyPassword Generator!")
+    nr_letters= int(input("How many letters would you like in your password?\n"))
+    nr_symbols = int(input(f"How many symbols would you like?\n"))
+    nr_numbers = int(input(f"How many numbers would you like?\n"))
+
+    password = generate_password(nr_letters, nr_symbols, nr_numbers)
+    print(f"Your password is: {password}")
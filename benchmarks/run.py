@@ -0,0 +1,205 @@
+# Benchmarks for the hot paths of the games.
+#
+# Every benchmark measures the best time per call over several repeats and the
+# results are compared against a JSON baseline. The run fails when a benchmark
+# is slower than its baseline by more than the threshold.
+#
+#   python benchmarks/run.py                  compare against benchmarks/baseline.json
+#   python benchmarks/run.py --update         record the current results as the baseline
+#   python benchmarks/run.py --threshold 0.5  allow benchmarks to be up to 50% slower
+#   python benchmarks/run.py score deck       only run benchmarks whose name contains a filter
+import contextlib
+import functools
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import timeit
+
+# The games aren't packages, each directory imports its siblings by name.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for directory in (ROOT, os.path.join(ROOT, 'Blackjack'), os.path.join(ROOT, 'unbonvieuxpendu')):
+    sys.path.insert(0, directory)
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# Maps a benchmark's name to a function that prepares it and returns the callable to time.
+BENCHMARKS = {}
+
+def benchmark(name):
+    ''' Register a benchmark. The decorated function does the setup and returns the callable to time. '''
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+@benchmark('blackjack.deck')
+def bench_deck():
+    from cards import Deck
+    return Deck
+
+@benchmark('blackjack.shuffle')
+def bench_shuffle():
+    from cards import Deck
+    deck = Deck(random.Random(0))
+    return deck.shuffle
+
+@benchmark('blackjack.deal')
+def bench_deal():
+    from cards import Deck
+    deck = Deck()
+    def deal():
+        deck.return_cards([deck.deal()])
+    return deal
+
+@benchmark('blackjack.score')
+def bench_score():
+    from blackjack import score
+    from cards import Card
+    hand = [Card('♠', 'A'), Card('♥', '7'), Card('♦', '5'), Card('♣', 'K')]
+    return lambda: score(hand)
+
+@benchmark('blackjack.format_cards')
+def bench_format_cards():
+    from blackjack import Player, format_cards
+    from cards import Deck
+    deck, player, dealer = Deck(), Player(), Player()
+    player.cards = [deck.deal(), deck.deal(), deck.deal()]
+    dealer.cards = [deck.deal(), deck.deal(faceup=False)]
+    return lambda: format_cards(player, dealer)
+
+@benchmark('caesar.encode_1mb')
+def bench_caesar():
+    from Caeser_cipher import alphabet, caesar
+    text = ''.join(random.Random(0).choices(alphabet, k=1_000_000))
+    return lambda: caesar(text, 7, 'encode')
+
+@benchmark('caesar.crack_1mb')
+def bench_crack():
+    from Caeser_cipher import alphabet, caesar
+    from Caeser_cracker import crack
+    text = caesar(''.join(random.Random(0).choices(alphabet + [' '], k=1_000_000)), 7, 'encode').encode()
+    return lambda: crack(text)
+
+@benchmark('pendu.recupmotmasque')
+def bench_recupmotmasque():
+    from fonctions import recupmotmasque
+    return lambda: recupmotmasque('anticonstitutionnellement', ['a', 'e', 'n', 't'])
+
+@benchmark('pendu.etatmot')
+def bench_etatmot():
+    from fonctions import EtatMot
+    def guess():
+        etat = EtatMot('anticonstitutionnellement')
+        for lettre in 'aeintoscmlu':
+            etat.proposer(lettre)
+        return etat.trouve
+    return guess
+
+@functools.lru_cache(maxsize=None)
+def leaderboard(players=1_000_000):
+    ''' Build a score store of a million players once, shared by the leaderboard benchmarks. '''
+    from stockagescores import StockageScores
+    rng = random.Random(0)
+    directory = tempfile.TemporaryDirectory()
+    scores = StockageScores(os.path.join(directory.name, 'scores.db'), lot=players + 1)
+    # Keep the directory alive with the store, it's removed when the run exits.
+    scores.directory = directory
+    for player in range(players):
+        scores.ajouter(f'Joueur{player:07d}', int(rng.expovariate(1 / 200)))
+    scores.vider()
+    scores.lot = 1
+    return scores
+
+@benchmark('pendu.leaderboard.meilleurs')
+def bench_meilleurs():
+    scores = leaderboard()
+    return lambda: scores.meilleurs(10)
+
+@benchmark('pendu.leaderboard.rang')
+def bench_rang():
+    scores = leaderboard()
+    return lambda: scores.rang('Joueur0500000')
+
+@benchmark('pendu.leaderboard.autour')
+def bench_autour():
+    scores = leaderboard()
+    return lambda: scores.autour(500_000, 5)
+
+@benchmark('pendu.leaderboard.ajouter')
+def bench_ajouter():
+    scores = leaderboard()
+    return lambda: scores.ajouter('Joueur0000001', 1)
+
+@benchmark('password.generate')
+def bench_password():
+    from Password_generator import generate_password
+    return lambda: generate_password(64, 16, 16)
+
+@benchmark('auction.find_highest_bidder')
+def bench_find_highest_bidder():
+    from Auction_program import find_highest_bidder
+    bids = {f'bidder{i}': random.Random(i).randint(1, 10_000) for i in range(10_000)}
+    return lambda: find_highest_bidder(bids)
+
+def measure(setup, repeat=5, budget=0.2) -> float:
+    ''' Return the best seconds per call of the benchmark's callable. '''
+    timer = timeit.Timer(setup())
+    # Pick a number of calls that takes about budget seconds per repeat.
+    number, elapsed = timer.autorange()
+    number = max(1, int(number * budget / max(elapsed, 1e-9)))
+    return min(timer.repeat(repeat, number)) / number
+
+def run(names) -> dict:
+    ''' Measure the benchmarks, discarding anything they print. '''
+    results = {}
+    for name in names:
+        with contextlib.redirect_stdout(io.StringIO()):
+            results[name] = measure(BENCHMARKS[name])
+    return results
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    ''' Print each result next to its baseline and return the names that regressed. '''
+    regressions = []
+    for name, seconds in results.items():
+        line = f'{name:<32} {seconds * 1e6:>14,.3f}µs'
+        if name in baseline:
+            change = seconds / baseline[name] - 1
+            line += f' {change:>+9.1%}'
+            if change > threshold:
+                regressions.append(name)
+                line += '  REGRESSION'
+        else:
+            line += '       new'
+        print(line)
+    return regressions
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark the hot paths of the games.')
+    parser.add_argument('filters', nargs='*', help='only run benchmarks whose name contains one of these')
+    parser.add_argument('--baseline', default=BASELINE, help='the JSON baseline file')
+    parser.add_argument('--threshold', type=float, default=0.25, help='allowed slowdown, 0.25 is 25%%')
+    parser.add_argument('--update', action='store_true', help='record the results as the new baseline')
+
+    args = parser.parse_args()
+    names = [name for name in BENCHMARKS if not args.filters or any(f in name for f in args.filters)]
+    results = run(names)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+
+    regressions = compare(results, baseline, args.threshold)
+    if args.update:
+        baseline.update(results)
+        with open(args.baseline, 'w') as file:
+            json.dump(baseline, file, indent=2, sort_keys=True)
+            file.write('\n')
+    elif regressions:
+        print(f'{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}.')
+        sys.exit(1)
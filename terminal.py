@@ -0,0 +1,70 @@
+# Terminal rendering shared by the games.
+#
+# Clearing the screen with os.system('cls||clear') starts a new process on
+# every redraw. Writing ANSI escape sequences does the same job without
+# leaving Python, and a Screen only rewrites the lines that changed between
+# two frames.
+import sys
+
+# Move the cursor to the top left corner and erase the whole screen.
+CLEAR = '\x1b[H\x1b[2J'
+# Erase from the cursor to the end of the line and to the end of the screen.
+ERASE_LINE = '\x1b[K'
+ERASE_BELOW = '\x1b[J'
+
+def move(row: int) -> str:
+    ''' Return the escape sequence moving the cursor to the start of a row. Rows start at 1. '''
+    return f'\x1b[{row};1H'
+
+def clear(stream=None):
+    ''' Clear the terminal screen without starting a process.
+        Nothing is written when the output isn't a terminal, such as a file or a pipe.
+    '''
+    stream = stream or sys.stdout
+    if stream.isatty():
+        stream.write(CLEAR)
+        stream.flush()
+
+class Screen:
+    ''' Draws frames of text, rewriting only the lines that changed since the previous frame.
+
+        When the output isn't a terminal every frame is written in full, the same as print.
+        >>> screen = Screen()
+        >>> screen.draw('dealer\\nQ♥ ??')
+        dealer
+        Q♥ ??
+    '''
+    def __init__(self, stream=None):
+        # The stream is looked up when drawing unless one is provided,
+        # so redirecting sys.stdout also redirects the screen.
+        self.stream = stream
+        self.lines = None
+
+    def reset(self):
+        ''' Forget the previous frame so the next draw clears the screen and starts over. '''
+        self.lines = None
+
+    def draw(self, text: str):
+        ''' Draw a frame. Every change is written to the stream at once. '''
+        stream = self.stream or sys.stdout
+        if not stream.isatty():
+            stream.write(text + '\n')
+            return
+
+        lines = text.split('\n')
+        if self.lines is None:
+            # The first frame starts from an empty screen.
+            output = [CLEAR, text, '\n']
+        else:
+            output = []
+            for row, line in enumerate(lines, start=1):
+                if row > len(self.lines) or self.lines[row - 1] != line:
+                    output += [move(row), line, ERASE_LINE]
+            # Anything below the frame, such as a prompt and its answer, is erased.
+            output += [move(len(lines) + 1), ERASE_BELOW]
+        self.lines = lines
+        stream.write(''.join(output))
+        stream.flush()
+
+# The screen used by the games.
+screen = Screen()
@@ -0,0 +1,196 @@
+"""
+Ce fichier définit le corpus de mots du programme pendu.
+
+Le corpus est un fichier texte (UTF-8) avec un mot par ligne, qui peut
+contenir des centaines de milliers de mots. Au lieu de le charger en
+mémoire, on construit une seule fois un fichier d'index à côté du corpus :
+- la position (en octets) de chaque mot dans le corpus
+- les numéros des mots triés par longueur puis par difficulté
+- un groupe (longueur, difficulté, début, fin) par sous-index
+
+Le corpus et l'index sont projetés en mémoire (mmap). Choisir un mot au
+hasard revient donc à tirer un numéro et à lire une ligne, sans lire le
+reste du fichier.
+
+Format de l'index (petit-boutiste) :
+ --------------------------------------------------------------------
+| en-tête    | ENTETE : "PNDU", version, taille et date du corpus,   |
+|            | nombre de mots, nombre de groupes                     |
+| positions  | nbmots entiers de 8 octets                            |
+| ordre      | nbmots entiers de 4 octets                            |
+| groupes    | nbgroupes fois GROUPE                                 |
+ --------------------------------------------------------------------
+"""
+
+import mmap
+import os
+import random
+import struct
+from array import array
+
+# Les lettres les plus fréquentes en français, les autres sont dites rares
+LETTRESCOURANTES = set("esaitnrulodcmp")
+
+# Les niveaux de difficulté : 0 facile, 1 moyen, 2 difficile
+NBDIFFICULTES = 3
+
+MAGIQUE = b"PNDU"
+VERSION = 1
+ENTETE = struct.Struct("<4sIQqII")
+GROUPE = struct.Struct("<HBxII")
+
+def difficulte(mot):
+    """
+    Cette fonction renvoie la difficulté d'un mot : le nombre de lettres
+    rares différentes qu'il contient, 2 au maximum.
+    """
+    return min(len(set(mot) - LETTRESCOURANTES), NBDIFFICULTES - 1)
+
+def construireindex(cheminmots, cheminindex):
+    """
+    Cette fonction lit le corpus cheminmots ligne par ligne et écrit son index
+    dans cheminindex. Les lignes vides ou qui ne sont pas composées uniquement
+    de lettres (mots composés, apostrophes...) ne sont pas indexées.
+    Elle renvoie le nombre de mots indexés.
+    """
+    positions = array('Q')
+    # Numéros des mots par (longueur, difficulté)
+    sousindex = {}
+    with open(cheminmots, 'rb') as fichiermots:
+        position = 0
+        for ligne in fichiermots:
+            mot = ligne.decode('utf-8').strip().lower()
+            if mot.isalpha():
+                sousindex.setdefault((len(mot), difficulte(mot)), array('I')).append(len(positions))
+                positions.append(position)
+            position += len(ligne)
+
+    ordre = array('I')
+    groupes = []
+    for (longueur, niveau), numeros in sorted(sousindex.items()):
+        groupes.append(GROUPE.pack(longueur, niveau, len(ordre), len(ordre) + len(numeros)))
+        ordre.extend(numeros)
+
+    infos = os.stat(cheminmots)
+    # On écrit dans un fichier temporaire pour ne jamais laisser un index incomplet
+    temporaire = cheminindex + ".tmp"
+    with open(temporaire, 'wb') as fichierindex:
+        fichierindex.write(ENTETE.pack(
+            MAGIQUE, VERSION, infos.st_size, infos.st_mtime_ns, len(positions), len(groupes)))
+        fichierindex.write(positions.tobytes())
+        fichierindex.write(ordre.tobytes())
+        fichierindex.write(b"".join(groupes))
+    os.replace(temporaire, cheminindex)
+    return len(positions)
+
+def indexajour(cheminmots, cheminindex):
+    """
+    Cette fonction vérifie que l'index existe et correspond au corpus
+    (même version, même taille, même date de modification).
+    """
+    if not os.path.exists(cheminindex):
+        return False
+    with open(cheminindex, 'rb') as fichierindex:
+        entete = fichierindex.read(ENTETE.size)
+    if len(entete) < ENTETE.size:
+        return False
+    magique, version, taille, date, _, _ = ENTETE.unpack(entete)
+    infos = os.stat(cheminmots)
+    return (magique, version, taille, date) == (MAGIQUE, VERSION, infos.st_size, infos.st_mtime_ns)
+
+class Corpus:
+    """
+    Cette classe donne accès aux mots d'un corpus à travers son index.
+    L'index est construit (ou reconstruit si le corpus a changé)
+    à l'ouverture ; par défaut il s'appelle comme le corpus suivi de ".idx".
+    """
+
+    def __init__(self, cheminmots, cheminindex=None):
+        cheminindex = cheminindex or cheminmots + ".idx"
+        if not indexajour(cheminmots, cheminindex):
+            construireindex(cheminmots, cheminindex)
+
+        self.fichiermots = open(cheminmots, 'rb')
+        self.fichierindex = open(cheminindex, 'rb')
+        # Un fichier vide ne peut pas être projeté en mémoire
+        self.mots = mmap.mmap(self.fichiermots.fileno(), 0, access=mmap.ACCESS_READ) \
+            if os.fstat(self.fichiermots.fileno()).st_size else b""
+        self.index = mmap.mmap(self.fichierindex.fileno(), 0, access=mmap.ACCESS_READ)
+
+        _, _, _, _, self.nbmots, nbgroupes = ENTETE.unpack_from(self.index)
+        debut = ENTETE.size
+        fin = debut + 8 * self.nbmots
+        # Les vues lisent directement dans l'index, sans copie
+        self.positions = memoryview(self.index)[debut:fin].cast('Q')
+        debut, fin = fin, fin + 4 * self.nbmots
+        self.ordre = memoryview(self.index)[debut:fin].cast('I')
+        self.groupes = [GROUPE.unpack_from(self.index, fin + numero * GROUPE.size)
+                        for numero in range(nbgroupes)]
+
+    def __len__(self):
+        return self.nbmots
+
+    def mot(self, numero):
+        """
+        Cette méthode renvoie le mot numéro numero du corpus.
+        """
+        debut = self.positions[numero]
+        fin = self.mots.find(b"\n", debut)
+        if fin == -1:
+            fin = len(self.mots)
+        return self.mots[debut:fin].decode('utf-8').strip().lower()
+
+    def sousindex(self, longueur=None, difficulte=None):
+        """
+        Cette méthode renvoie les groupes (début, fin) de l'ordre des mots
+        qui ont cette longueur et cette difficulté (None : toutes).
+        """
+        return [(debut, fin) for groupelongueur, groupedifficulte, debut, fin in self.groupes
+                if longueur in (None, groupelongueur) and difficulte in (None, groupedifficulte)]
+
+    def compter(self, longueur=None, difficulte=None):
+        """
+        Cette méthode renvoie le nombre de mots de cette longueur et de cette difficulté.
+        """
+        return sum(fin - debut for debut, fin in self.sousindex(longueur, difficulte))
+
+    def choisir(self, longueur=None, difficulte=None, hasard=random):
+        """
+        Cette méthode renvoie un mot au hasard, de cette longueur et de cette
+        difficulté si elles sont précisées. On tire un numéro parmi les mots
+        des sous-index concernés, sans parcourir les mots eux-mêmes.
+        """
+        if longueur is None and difficulte is None:
+            if not self.nbmots:
+                raise IndexError("le corpus ne contient aucun mot")
+            return self.mot(hasard.randrange(self.nbmots))
+
+        groupes = self.sousindex(longueur, difficulte)
+        if not groupes:
+            raise IndexError("aucun mot de longueur {0} et de difficulté {1}".format(longueur, difficulte))
+        # Un numéro parmi tous les mots des groupes, puis le groupe qui le contient
+        tirage = hasard.randrange(sum(fin - debut for debut, fin in groupes))
+        for debut, fin in groupes:
+            if tirage < fin - debut:
+                break
+            tirage -= fin - debut
+        return self.mot(self.ordre[debut + tirage])
+
+    def fermer(self):
+        """
+        Cette méthode libère les projections en mémoire et ferme les fichiers.
+        """
+        # Les vues doivent être libérées avant de fermer la projection
+        self.positions.release()
+        self.ordre.release()
+        self.index.close()
+        if isinstance(self.mots, mmap.mmap):
+            self.mots.close()
+        self.fichiermots.close()
+        self.fichierindex.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
@@ -6,9 +6,22 @@ utiles au programme pendu
 # Nombre de coups par partie
 nbcoups = 8
 
-# Nom du fichier stockant les scores
+# Nom de l'ancien fichier stockant les scores (pickle), importé une fois dans la base
 nomfichierscores = "scores"
 
+# Nom de la base stockant les scores
+nomfichierbase = "scores.db"
+
+# Nombre de mises à jour de scores mises en attente avant l'écriture dans la base
+lotscores = 1
+
+# Fichier du corpus de mots (un mot par ligne), None pour utiliser listemots
+fichiercorpus = None
+
+# Longueur et difficulté (0 facile, 1 moyen, 2 difficile) des mots choisis, None pour toutes
+longueurmot = None
+difficultemot = None
+
 # Liste des mots du pendu
 listemots = [
     "armoire", "boucle", "buisson", "bureau", "chaise", "carton", 
@@ -5,8 +5,11 @@ On utilise les données du programme contenues dans donnees.py
 
 import os
 import pickle
+from functools import lru_cache
 from random import choice
 from donnees import *
+from corpus import Corpus, difficulte
+from stockagescores import StockageScores
 
 # Gestion des scores
 def recupscores():
@@ -35,40 +38,80 @@ def enregistrerscores(scores):
         monpickler = pickle.Pickler(fichierscores)
         monpickler.dump(scores)
 
+def ouvrirscores():
+    """
+    Cette fonction ouvre la base des scores nomfichierbase.
+    Si l'ancien fichier nomfichierscores existe, ses scores sont importés
+    dans la base la première fois.
+    """
+    scores = StockageScores(nomfichierbase, lot=lotscores)
+    scores.migrer(nomfichierscores)
+    return scores
+
 # Fonctions gérant les éléments saisis par l'utilisateur
-def recupnomutilisateur():
+def validernom(saisie):
     """
-    Fonction chargée de récupérer le nom de l'utilisateur.
+    Cette fonction vérifie un nom d'utilisateur saisi, sans rien demander.
     Le nom de l'utilisateur doit être composé de 4 caractères minimum,
     chiffres et lettres exclusivement.
-    Si ce nom n'est pas valide, on appelle récursivement la fonction
-    pour en obtenir un nouveau
+    On renvoie le nom avec une majuscule, ou None s'il n'est pas valide.
     """
-    nomutilisateur = input("Tapez votre nom: ").capitalize()
+    nomutilisateur = saisie.capitalize()
     if not nomutilisateur.isalnum() or len(nomutilisateur) < 4:
+        return None
+    return nomutilisateur
+
+def validerlettre(saisie):
+    """
+    Cette fonction vérifie une lettre saisie, sans rien demander.
+    On renvoie la lettre en minuscule, ou None si ce n'est pas une lettre.
+    """
+    lettre = saisie.lower()
+    if len(lettre) > 1 or not lettre.isalpha():
+        return None
+    return lettre
+
+def recupnomutilisateur():
+    """
+    Fonction chargée de récupérer le nom de l'utilisateur.
+    Si ce nom n'est pas valide (voir validernom),
+    on en demande un nouveau jusqu'à obtenir un nom valide
+    """
+    while (nomutilisateur := validernom(input("Tapez votre nom: "))) is None:
         print("Ce nom est invalide.")
-        return recupnomutilisateur()
     return nomutilisateur
 
 def recuplettre():
     """
     Cette fonction récupère une lettre saisie par l'utilisateur.
-    Si la chaîne récupérée n'est pas une lettre,
-    on appelle récursivement la fonction jusqu'à obtenir une lettre
+    Si la chaîne récupérée n'est pas une lettre (voir validerlettre),
+    on en demande une nouvelle jusqu'à obtenir une lettre
     """
-    lettre = input("Tapez une lettre: ").lower()
-    if len(lettre) > 1 or not lettre.isalpha():
+    while (lettre := validerlettre(input("Tapez une lettre: "))) is None:
         print("Vous n'avez pas saisi une lettre valide.")
-        return recuplettre()
     return lettre
 
 # Fonctions du jeu de pendu
-def choisirmot():
+@lru_cache(maxsize=None)
+def chargercorpus(cheminmots):
+    """
+    Cette fonction ouvre le corpus cheminmots une seule fois par programme.
+    """
+    return Corpus(cheminmots)
+
+def choisirmot(longueur=longueurmot, niveau=difficultemot):
     """
-    Cette fonction renvoie le mot choisi dans la liste des mots listemots.
-    On utilise la fonction choice du module random (voir l'aide).
+    Cette fonction renvoie un mot au hasard, de cette longueur et de ce niveau
+    de difficulté s'ils sont précisés.
+    Si fichiercorpus est défini dans donnees.py, on tire le mot dans le corpus,
+    sinon dans la liste des mots listemots avec la fonction choice
+    du module random (voir l'aide).
     """
-    return choice(listemots)
+    if fichiercorpus:
+        return chargercorpus(fichiercorpus).choisir(longueur, niveau)
+    mots = [mot for mot in listemots
+            if longueur in (None, len(mot)) and niveau in (None, difficulte(mot))]
+    return choice(mots)
 
 def recupmotmasque(motcomplet, lettrestrouvees):
     """
@@ -85,3 +128,50 @@ def recupmotmasque(motcomplet, lettrestrouvees):
         else:
             motmasque += "*"
     return motmasque
+
+class EtatMot:
+    """
+    Cette classe garde l'état du mot à trouver pendant une partie.
+    On calcule une seule fois les positions de chaque lettre du mot ;
+    une lettre proposée ne met ensuite à jour que ses propres positions
+    dans le masque, et on compte les lettres qui restent à trouver.
+    """
+
+    def __init__(self, motatrouver):
+        self.motatrouver = motatrouver
+        # Positions de chaque lettre dans le mot
+        self.positions = {}
+        for position, lettre in enumerate(motatrouver):
+            self.positions.setdefault(lettre, []).append(position)
+        self.masque = ["*"] * len(motatrouver)
+        self.lettrestrouvees = set()
+        self.nbrestantes = len(motatrouver)
+
+    def proposer(self, lettre):
+        """
+        Cette méthode dévoile la lettre dans le masque si elle est dans le mot
+        et n'a pas encore été trouvée. Elle renvoie le nombre de lettres dévoilées.
+        """
+        if lettre in self.lettrestrouvees or lettre not in self.positions:
+            return 0
+        self.lettrestrouvees.add(lettre)
+        positions = self.positions[lettre]
+        for position in positions:
+            self.masque[position] = lettre
+        self.nbrestantes -= len(positions)
+        return len(positions)
+
+    @property
+    def motmasque(self):
+        """
+        Le mot avec des * à la place des lettres pas encore trouvées,
+        comme recupmotmasque.
+        """
+        return "".join(self.masque)
+
+    @property
+    def trouve(self):
+        """
+        Vrai quand toutes les lettres du mot ont été trouvées.
+        """
+        return self.nbrestantes == 0
@@ -0,0 +1,107 @@
+"""
+Ce fichier contient un client qui fait jouer de nombreux robots
+contre serveur.py en même temps, pour mesurer le serveur.
+
+Chaque robot ouvre une session, choisit ses lettres avec le solveur
+et joue un nombre fixé de parties. À la fin, on affiche le nombre de
+sessions par seconde et la latence aller-retour de chaque réponse.
+"""
+
+import asyncio
+import time
+
+from donnees import listemots
+from serveur import centile
+from solveur import Solveur
+
+class Robot:
+    """
+    Cette classe joue une session de robot.
+    """
+
+    def __init__(self, nom, nbparties, solveur):
+        self.nom = nom
+        self.nbparties = nbparties
+        self.solveur = solveur
+        self.jouees = 0
+        self.latences = []
+        self.partie = None
+        self.lettre = None
+
+    def repondre(self, question):
+        """
+        Cette méthode renvoie la réponse du robot à une question du serveur.
+        """
+        if question == "nom":
+            return self.nom
+        if question == "continuer":
+            self.jouees += 1
+            self.partie = None
+            self.lettre = None
+            return 'o' if self.jouees < self.nbparties else 'n'
+        _, masque, _ = question.split()
+        if self.partie is None:
+            self.partie = self.solveur.partie(len(masque))
+        elif self.lettre is not None:
+            self.partie.observer(self.lettre, masque)
+        self.lettre = self.partie.choisir()
+        return self.lettre
+
+    async def jouer(self, hote, port):
+        """
+        Cette méthode se connecte et joue jusqu'à la fin de la session.
+        """
+        lecteur, ecrivain = await asyncio.open_connection(hote, port)
+        envoyee = None
+        try:
+            while ligne := (await lecteur.readline()).decode():
+                if ligne.startswith("! "):
+                    break
+                if not ligne.startswith("? "):
+                    continue
+                if envoyee is not None:
+                    self.latences.append(time.perf_counter() - envoyee)
+                ecrivain.write(self.repondre(ligne[2:].strip()).encode() + b"\n")
+                await ecrivain.drain()
+                envoyee = time.perf_counter()
+        finally:
+            ecrivain.close()
+
+async def lancer(nbsessions, nbparties, hote="127.0.0.1", port=8022, concurrence=500):
+    """
+    Cette fonction joue les sessions, avec au plus concurrence connexions
+    ouvertes en même temps, et affiche un rapport.
+    """
+    limite = asyncio.Semaphore(concurrence)
+    solveur = Solveur(listemots)
+    robots = [Robot("Robot{0:06d}".format(numero), nbparties, solveur) for numero in range(nbsessions)]
+
+    async def jouer(robot):
+        async with limite:
+            await robot.jouer(hote, port)
+
+    debut = time.perf_counter()
+    await asyncio.gather(*[jouer(robot) for robot in robots])
+    duree = time.perf_counter() - debut
+
+    latences = [latence for robot in robots for latence in robot.latences]
+    jouees = sum(robot.jouees for robot in robots)
+    rapport = "sessions : {0} | sessions/s : {1:,.0f} | parties : {2} | parties/s : {3:,.0f}".format(
+        nbsessions, nbsessions / duree, jouees, jouees / duree)
+    if latences:
+        rapport += " | aller-retour p50 : {0:,.0f}µs | p99 : {1:,.0f}µs".format(
+            centile(latences, 0.5) * 1e6, centile(latences, 0.99) * 1e6)
+    print(rapport)
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Fait jouer de nombreux robots contre le serveur de pendu.")
+    parser.add_argument("--sessions", type=int, default=1_000)
+    parser.add_argument("--parties", type=int, default=5, help="parties jouées par chaque session")
+    parser.add_argument("--concurrence", type=int, default=500, help="connexions ouvertes en même temps")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8022)
+
+    args = parser.parse_args()
+    asyncio.run(lancer(args.sessions, args.parties, args.host, args.port, args.concurrence))
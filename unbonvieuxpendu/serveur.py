@@ -0,0 +1,212 @@
+"""
+Ce fichier contient un serveur asyncio qui héberge de nombreuses sessions
+de pendu en même temps, une par connexion TCP.
+
+Chaque session suit les étapes de pendu.py, mais les saisies arrivent
+par la connexion et sont vérifiées avec validernom et validerlettre.
+Toutes les sessions partagent un seul StockageScores avec un cache :
+les points sont mis en attente en mémoire et écrits dans la base
+par lots, toutes les vidage secondes, et non à la fin de chaque session.
+
+Le protocole est ligne par ligne. Les lignes qui commencent par "? "
+attendent une ligne en réponse, les autres sont à afficher :
+ ---------------------------------------------------------------
+|          question           |             réponse             |
+ ---------------------------------------------------------------
+| ? nom                       | le nom de l'utilisateur         |
+| ? lettre <masque> <chances> | une lettre                      |
+| ? continuer                 | o pour rejouer, n pour arrêter  |
+ ---------------------------------------------------------------
+Une ligne qui commence par "! " termine la session.
+"""
+
+import asyncio
+import sqlite3
+import time
+
+from donnees import nbcoups, nomfichierbase
+from fonctions import EtatMot, choisirmot, validerlettre, validernom
+from stockagescores import StockageScores
+
+def centile(valeurs, fraction):
+    """
+    Cette fonction renvoie la valeur sous laquelle se trouve
+    la fraction demandée des valeurs.
+    """
+    triees = sorted(valeurs)
+    return triees[min(int(len(triees) * fraction), len(triees) - 1)]
+
+class Statistiques:
+    """
+    Cette classe compte les sessions et les parties terminées,
+    et garde la latence de chaque réponse pour le rapport périodique.
+    La latence est le temps entre la réception d'une réponse
+    et l'envoi de la question suivante.
+    """
+
+    def __init__(self):
+        self.sessions = 0
+        self.remiseazero()
+
+    def remiseazero(self):
+        self.latences = []
+        self.terminees = 0
+        self.parties = 0
+        self.debut = time.perf_counter()
+
+    def rapport(self):
+        """
+        Cette méthode résume la période en cours et en commence une nouvelle.
+        """
+        duree = time.perf_counter() - self.debut
+        resume = "sessions : {0} | sessions/s : {1:,.0f} | parties/s : {2:,.0f}".format(
+            self.sessions, self.terminees / duree, self.parties / duree)
+        if self.latences:
+            resume += " | latence p50 : {0:,.0f}µs | p99 : {1:,.0f}µs".format(
+                centile(self.latences, 0.5) * 1e6, centile(self.latences, 0.99) * 1e6)
+        self.remiseazero()
+        return resume
+
+class Session:
+    """
+    Cette classe joue les parties d'une connexion.
+    """
+
+    def __init__(self, lecteur, ecrivain, scores, statistiques):
+        self.lecteur = lecteur
+        self.ecrivain = ecrivain
+        self.scores = scores
+        self.statistiques = statistiques
+        # Le moment où la dernière réponse a été reçue, pour mesurer la latence
+        self.recue = None
+
+    async def envoyer(self, texte):
+        self.ecrivain.write(texte.encode() + b"\n")
+        await self.ecrivain.drain()
+
+    async def demander(self, question):
+        """
+        Cette méthode envoie une question et attend la réponse.
+        """
+        if self.recue is not None:
+            self.statistiques.latences.append(time.perf_counter() - self.recue)
+        await self.envoyer("? " + question)
+        ligne = await self.lecteur.readline()
+        if not ligne:
+            raise ConnectionError("le joueur est parti")
+        self.recue = time.perf_counter()
+        return ligne.decode().strip()
+
+    async def recupnomutilisateur(self):
+        while (nomutilisateur := validernom(await self.demander("nom"))) is None:
+            await self.envoyer("Ce nom est invalide.")
+        return nomutilisateur
+
+    async def recuplettre(self, etat, nbchances):
+        while (lettre := validerlettre(await self.demander(
+                "lettre {0} {1}".format(etat.motmasque, nbchances)))) is None:
+            await self.envoyer("Vous n'avez pas saisi une lettre valide.")
+        return lettre
+
+    async def jouer(self):
+        """
+        Cette méthode joue les parties jusqu'à ce que le joueur arrête ou parte.
+        """
+        try:
+            utilisateur = await self.recupnomutilisateur()
+            self.scores.ajouter(utilisateur, 0)
+            continuerpartie = 'o'
+            while continuerpartie != 'n':
+                await self.envoyer("Joueur {0}: {1} point(s)".format(
+                    utilisateur, self.scores.score(utilisateur)))
+                motatrouver = choisirmot()
+                etat = EtatMot(motatrouver)
+                nbchances = nbcoups
+
+                while not etat.trouve and nbchances > 0:
+                    lettre = await self.recuplettre(etat, nbchances)
+                    if lettre in etat.lettrestrouvees:
+                        await self.envoyer("Vous avez déjà choisi cette lettre.")
+                    elif etat.proposer(lettre):
+                        await self.envoyer("Bien joué.")
+                    else:
+                        nbchances -= 1
+                        await self.envoyer("... non, cette lettre ne se trouve pas dans le mot...")
+
+                if etat.trouve:
+                    await self.envoyer("Félicitations ! Vous avez trouvé le mot {0}.".format(motatrouver))
+                else:
+                    await self.envoyer("PENDU !!! Vous avez perdu.")
+                self.scores.ajouter(utilisateur, nbchances)
+                self.statistiques.parties += 1
+
+                continuerpartie = (await self.demander("continuer")).lower()
+
+            await self.envoyer("! Vous finissez la partie avec {0} points.".format(
+                self.scores.score(utilisateur)))
+            self.statistiques.terminees += 1
+        except ConnectionError:
+            pass
+        finally:
+            self.ecrivain.close()
+
+async def vider(scores, vidage):
+    """
+    Cette fonction écrit les points en attente dans la base toutes les vidage secondes.
+    L'écriture bloque la boucle : si un autre programme tient la base,
+    on n'attend pas longtemps et les points restent en attente jusqu'au vidage suivant.
+    """
+    while True:
+        await asyncio.sleep(vidage)
+        try:
+            scores.vider()
+        except sqlite3.OperationalError:
+            pass
+
+async def servir(hote="127.0.0.1", port=8022, cheminbase=nomfichierbase, intervalle=5.0, vidage=1.0):
+    """
+    Cette fonction accepte les connexions sans fin et affiche un rapport
+    toutes les intervalle secondes.
+    """
+    # Le lot ne sert que de limite : les points sont écrits par vider toutes les vidage secondes
+    scores = StockageScores(cheminbase, lot=100_000, cache=True)
+    # Une fois la base prête, on attend au plus 50 ms qu'une autre session libère la base,
+    # pour ne pas bloquer toutes les sessions pendant un vidage
+    scores.connexion.execute("PRAGMA busy_timeout = 50")
+    statistiques = Statistiques()
+
+    async def accueillir(lecteur, ecrivain):
+        statistiques.sessions += 1
+        try:
+            await Session(lecteur, ecrivain, scores, statistiques).jouer()
+        finally:
+            statistiques.sessions -= 1
+
+    # Une grande file d'attente permet à des milliers de robots de se connecter en même temps
+    serveur = await asyncio.start_server(accueillir, hote, port, backlog=4096)
+    print("pendu sur {0}:{1}".format(hote, port))
+    tache = asyncio.create_task(vider(scores, vidage))
+    try:
+        async with serveur:
+            while True:
+                await asyncio.sleep(intervalle)
+                print(statistiques.rapport())
+    finally:
+        tache.cancel()
+        scores.fermer()
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Héberge de nombreuses sessions de pendu.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8022)
+    parser.add_argument("--base", default=nomfichierbase, help="la base des scores")
+    parser.add_argument("--interval", type=float, default=5.0, help="secondes entre deux rapports")
+    parser.add_argument("--vidage", type=float, default=1.0, help="secondes entre deux écritures des scores")
+
+    args = parser.parse_args()
+    try:
+        asyncio.run(servir(args.host, args.port, args.base, args.interval, args.vidage))
+    except KeyboardInterrupt:
+        pass
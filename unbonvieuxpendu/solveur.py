@@ -0,0 +1,213 @@
+"""
+Ce fichier définit un joueur automatique pour le pendu.
+
+Le solveur garde, pour chaque (longueur, lettre, position), l'ensemble des
+mots du vocabulaire qui ont cette lettre à cette position. Les ensembles
+sont des bitsets : un entier dont le bit numéro n vaut 1 si le mot numéro n
+en fait partie. Filtrer les mots encore possibles après une proposition
+revient alors à quelques intersections (&) d'entiers.
+
+Pour choisir une lettre, on regarde comment elle découperait les mots
+encore possibles selon les positions où elle apparaît, et on choisit celle
+qui apporte le plus d'information (l'entropie de ce découpage).
+
+Utilisé comme programme, il joue tous les mots d'un vocabulaire et affiche
+le nombre de parties par seconde et le taux de victoire :
+    python solveur.py
+    python solveur.py --corpus mots.txt --nbcoups 6 --limite 10000
+"""
+
+import math
+import time
+
+from donnees import listemots, nbcoups
+from fonctions import EtatMot
+
+def bitset(numeros, taille):
+    """
+    Cette fonction renvoie le bitset des numéros : on remplit les octets
+    puis on les convertit en un seul entier, plutôt que d'ajouter
+    les bits un par un à un entier qui grandit.
+    """
+    octets = bytearray((taille + 7) // 8)
+    for numero in numeros:
+        octets[numero >> 3] |= 1 << (numero & 7)
+    return int.from_bytes(octets, 'little')
+
+class Solveur:
+    """
+    Cette classe indexe un vocabulaire (une liste de mots) pour le solveur.
+    Les choix de lettres sont mémorisés : deux parties qui ont reçu
+    les mêmes réponses choisissent la même lettre sans la recalculer.
+    """
+
+    def __init__(self, mots):
+        # Les mots sont numérotés à l'intérieur de leur longueur, ce qui garde
+        # les bitsets aussi petits que le nombre de mots de cette longueur
+        self.mots = {}
+        for mot in dict.fromkeys(mots):
+            self.mots.setdefault(len(mot), []).append(mot)
+        # longueur -> tous les mots de cette longueur
+        self.parlongueur = {}
+        # (longueur, lettre, position) -> mots ayant cette lettre à cette position
+        self.index = {}
+        # (longueur, lettre) -> mots de cette longueur contenant cette lettre
+        self.contient = {}
+        for longueur, motslongueur in self.mots.items():
+            self.parlongueur[longueur] = (1 << len(motslongueur)) - 1
+            numeros = {}
+            for numero, mot in enumerate(motslongueur):
+                for position, lettre in enumerate(mot):
+                    numeros.setdefault((longueur, lettre, position), []).append(numero)
+            for cle, liste in numeros.items():
+                self.index[cle] = bitset(liste, len(motslongueur))
+                self.contient[cle[:2]] = self.contient.get(cle[:2], 0) | self.index[cle]
+        self.lettres = sorted({lettre for mot in mots for lettre in mot})
+        # (longueur, réponses reçues) -> lettre choisie
+        self.choix = {}
+
+    def __len__(self):
+        return sum(len(motslongueur) for motslongueur in self.mots.values())
+
+    def partie(self, longueur):
+        """
+        Cette méthode commence une partie pour un mot de cette longueur.
+        """
+        return PartieSolveur(self, longueur)
+
+    def decoupage(self, candidats, longueur, lettre):
+        """
+        Cette méthode découpe les candidats selon les positions de la lettre :
+        elle renvoie la taille de chaque groupe de mots qui donneraient
+        la même réponse si on proposait cette lettre.
+        """
+        absents = candidats & ~self.contient.get((longueur, lettre), 0)
+        groupes = [candidats & ~absents]
+        for position in range(longueur):
+            avec = self.index.get((longueur, lettre, position), 0)
+            nouveaux = []
+            for groupe in groupes:
+                for partie in (groupe & avec, groupe & ~avec):
+                    if partie:
+                        nouveaux.append(partie)
+            groupes = nouveaux
+        return [groupe.bit_count() for groupe in groupes] + ([absents.bit_count()] if absents else [])
+
+    def information(self, candidats, longueur, lettre):
+        """
+        Cette méthode renvoie l'information attendue (en bits) de la lettre,
+        et le nombre de candidats qui la contiennent pour départager.
+        """
+        tailles = self.decoupage(candidats, longueur, lettre)
+        total = sum(tailles)
+        entropie = -sum(taille / total * math.log2(taille / total) for taille in tailles)
+        presents = (candidats & self.contient.get((longueur, lettre), 0)).bit_count()
+        return entropie, presents
+
+class PartieSolveur:
+    """
+    Cette classe garde les mots encore possibles pendant une partie du solveur.
+    """
+
+    def __init__(self, solveur, longueur):
+        self.solveur = solveur
+        self.longueur = longueur
+        self.candidats = solveur.parlongueur.get(longueur, 0)
+        self.proposees = set()
+        # Les réponses reçues, dans l'ordre, servent de clé aux choix mémorisés
+        self.reponses = ()
+
+    def choisir(self):
+        """
+        Cette méthode renvoie la lettre qui apporte le plus d'information.
+        """
+        cle = (self.longueur, self.reponses)
+        if cle not in self.solveur.choix:
+            lettres = [lettre for lettre in self.solveur.lettres if lettre not in self.proposees]
+            if not self.candidats:
+                # Le mot n'est pas dans le vocabulaire : on ne peut plus que deviner
+                choix = lettres[0]
+            else:
+                choix = max(lettres, key=lambda lettre: self.solveur.information(
+                    self.candidats, self.longueur, lettre))
+            self.solveur.choix[cle] = choix
+        return self.solveur.choix[cle]
+
+    def observer(self, lettre, masque):
+        """
+        Cette méthode garde les candidats compatibles avec la réponse :
+        le masque après la proposition de la lettre, avec * ou _ pour
+        les lettres cachées.
+        """
+        self.proposees.add(lettre)
+        positions = tuple(position for position, visible in enumerate(masque) if visible == lettre)
+        self.reponses += ((lettre, positions),)
+        index = self.solveur.index
+        # La lettre est exactement aux positions dévoilées, et nulle part ailleurs
+        for position in range(self.longueur):
+            avec = index.get((self.longueur, lettre, position), 0)
+            self.candidats &= avec if position in positions else ~avec
+
+def jouer(solveur, motatrouver, nbcoups=nbcoups):
+    """
+    Cette fonction fait jouer le solveur sur motatrouver, avec les règles de pendu.py.
+    Elle renvoie vrai si le mot a été trouvé.
+    """
+    etat = EtatMot(motatrouver)
+    partie = solveur.partie(len(motatrouver))
+    nbchances = nbcoups
+    while not etat.trouve and nbchances > 0:
+        lettre = partie.choisir()
+        if not etat.proposer(lettre):
+            nbchances -= 1
+        partie.observer(lettre, etat.masque)
+    return etat.trouve
+
+def rappelhangman(solveur):
+    """
+    Cette fonction renvoie un guess_callable pour la fonction play de Hangman.py :
+    à chaque appel, il lit la réponse à la lettre précédente dans word_guess
+    et propose la suivante.
+    """
+    etat = {}
+    def guess_callable(word_guess):
+        if etat.get('word_guess') is not word_guess:
+            # play crée une nouvelle liste word_guess à chaque partie
+            etat.update(word_guess=word_guess, partie=solveur.partie(len(word_guess)), lettre=None)
+        partie = etat['partie']
+        if etat['lettre'] is not None:
+            partie.observer(etat['lettre'], word_guess)
+        etat['lettre'] = partie.choisir()
+        return etat['lettre']
+    return guess_callable
+
+def banc(mots, nbcoups=nbcoups):
+    """
+    Cette fonction fait jouer le solveur sur tous les mots et renvoie
+    (nombre de parties, nombre de victoires, durée en secondes).
+    """
+    solveur = Solveur(mots)
+    debut = time.perf_counter()
+    victoires = sum(jouer(solveur, mot, nbcoups)
+                    for motslongueur in solveur.mots.values() for mot in motslongueur)
+    return len(solveur), victoires, time.perf_counter() - debut
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Fait jouer le solveur sur tous les mots d'un vocabulaire.")
+    parser.add_argument("--corpus", help="le fichier corpus (un mot par ligne), listemots par défaut")
+    parser.add_argument("--nbcoups", type=int, default=nbcoups, help="le nombre de coups par partie")
+    parser.add_argument("--limite", type=int, help="ne jouer que les premiers mots du corpus")
+
+    args = parser.parse_args()
+    if args.corpus:
+        from corpus import Corpus
+        with Corpus(args.corpus) as corpus:
+            mots = [corpus.mot(numero) for numero in range(min(len(corpus), args.limite or len(corpus)))]
+    else:
+        mots = listemots[:args.limite]
+
+    nbparties, victoires, duree = banc(mots, args.nbcoups)
+    print("{0} parties en {1:.2f} s : {2:.0f} parties par seconde".format(nbparties, duree, nbparties / duree))
+    print("{0} victoires avec {1} coups : {2:.1%}".format(victoires, args.nbcoups, victoires / nbparties))
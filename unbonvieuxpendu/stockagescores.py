@@ -0,0 +1,244 @@
+"""
+Ce fichier définit le stockage des scores du programme pendu.
+
+Les scores sont enregistrés dans une base SQLite, une ligne par utilisateur.
+On ne charge donc plus tous les scores au démarrage : on lit seulement
+la ligne de l'utilisateur quand on en a besoin.
+
+Les points gagnés sont d'abord mis en attente, puis ajoutés à la base
+par lots, dans une seule transaction. Chaque écriture ajoute les points
+au score déjà enregistré (score = score + points), donc deux parties
+jouées en même temps ne s'écrasent pas l'une l'autre.
+
+Le classement s'appuie sur un index trié par score, tenu à jour par SQLite
+à chaque écriture : lire les N meilleurs ne lit que N lignes de l'index.
+"""
+
+import os
+import pickle
+import sqlite3
+
+# Les tables de la base :
+# - scores : une ligne par utilisateur, avec l'index classement trié comme le classement
+# - effectifs : le nombre d'utilisateurs par score, tenu à jour par les déclencheurs,
+#   pour calculer un rang sans compter les utilisateurs un par un
+# - migrations : les anciens fichiers pickle déjà importés
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS scores ("
+    "utilisateur TEXT PRIMARY KEY, score INTEGER NOT NULL DEFAULT 0)",
+    "CREATE INDEX IF NOT EXISTS classement ON scores (score DESC, utilisateur)",
+    "CREATE TABLE IF NOT EXISTS effectifs (score INTEGER PRIMARY KEY, nombre INTEGER NOT NULL)",
+    "CREATE TRIGGER IF NOT EXISTS effectifsajout AFTER INSERT ON scores BEGIN "
+    "INSERT INTO effectifs VALUES (new.score, 1) "
+    "ON CONFLICT (score) DO UPDATE SET nombre = nombre + 1; END",
+    "CREATE TRIGGER IF NOT EXISTS effectifsmaj AFTER UPDATE OF score ON scores "
+    "WHEN old.score != new.score BEGIN "
+    "UPDATE effectifs SET nombre = nombre - 1 WHERE score = old.score; "
+    "DELETE FROM effectifs WHERE score = old.score AND nombre = 0; "
+    "INSERT INTO effectifs VALUES (new.score, 1) "
+    "ON CONFLICT (score) DO UPDATE SET nombre = nombre + 1; END",
+    "CREATE TRIGGER IF NOT EXISTS effectifssuppression AFTER DELETE ON scores BEGIN "
+    "UPDATE effectifs SET nombre = nombre - 1 WHERE score = old.score; "
+    "DELETE FROM effectifs WHERE score = old.score AND nombre = 0; END",
+    "CREATE TABLE IF NOT EXISTS migrations (fichier TEXT PRIMARY KEY)",
+]
+
+# Ajoute des points au score d'un utilisateur, en le créant s'il n'existe pas
+AJOUT = ("INSERT INTO scores (utilisateur, score) VALUES (?, ?) "
+         "ON CONFLICT (utilisateur) DO UPDATE SET score = score + excluded.score")
+
+class StockageScores:
+    """
+    Cette classe donne accès aux scores enregistrés dans la base cheminbase.
+    - lot est le nombre de mises à jour mises en attente avant l'écriture
+      dans la base (1 : on écrit à chaque mise à jour)
+    - attente est le temps en secondes pendant lequel on attend
+      qu'une autre session libère la base
+    - avec cache, les scores lus restent en mémoire : à utiliser quand
+      ce programme est le seul à écrire dans la base, comme le serveur
+    """
+
+    def __init__(self, cheminbase, lot=64, attente=10.0, cache=False):
+        # isolation_level=None : on gère nous-mêmes les transactions
+        self.connexion = sqlite3.connect(cheminbase, timeout=attente, isolation_level=None)
+        # Le mode WAL permet de lire pendant qu'une autre session écrit
+        self.connexion.execute("PRAGMA journal_mode=WAL")
+        self.connexion.execute("BEGIN IMMEDIATE")
+        try:
+            nouveau = not self.connexion.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'effectifs'").fetchone()
+            for requete in SCHEMA:
+                self.connexion.execute(requete)
+            if nouveau:
+                # Base créée avant le classement : on compte les scores existants
+                self.connexion.execute(
+                    "INSERT INTO effectifs SELECT score, COUNT(*) FROM scores GROUP BY score")
+        except BaseException:
+            self.connexion.execute("ROLLBACK")
+            raise
+        self.connexion.execute("COMMIT")
+        self.lot = lot
+        # Points en attente d'écriture, par utilisateur
+        self.enattente = {}
+        self.nbenattente = 0
+        # Scores déjà écrits dans la base, par utilisateur, si on garde un cache
+        self.cache = {} if cache else None
+
+    def score(self, utilisateur):
+        """
+        Cette méthode renvoie le score de l'utilisateur,
+        points en attente compris, ou 0 s'il n'a pas encore de score.
+        """
+        if self.cache is not None and utilisateur in self.cache:
+            score = self.cache[utilisateur]
+        else:
+            ligne = self.connexion.execute(
+                "SELECT score FROM scores WHERE utilisateur = ?", (utilisateur,)).fetchone()
+            score = ligne[0] if ligne else 0
+            if self.cache is not None:
+                self.cache[utilisateur] = score
+        return score + self.enattente.get(utilisateur, 0)
+
+    def ajouter(self, utilisateur, points):
+        """
+        Cette méthode ajoute des points au score de l'utilisateur.
+        Ajouter 0 point enregistre l'utilisateur sans changer son score.
+        Les points sont écrits dans la base quand le lot est plein.
+        """
+        self.enattente[utilisateur] = self.enattente.get(utilisateur, 0) + points
+        self.nbenattente += 1
+        if self.nbenattente >= self.lot:
+            self.vider()
+
+    def vider(self):
+        """
+        Cette méthode écrit les points en attente dans la base,
+        dans une seule transaction.
+        """
+        if not self.enattente:
+            return
+        # BEGIN IMMEDIATE prend le verrou d'écriture tout de suite :
+        # les autres sessions attendent au lieu d'échouer au milieu de la transaction
+        self.connexion.execute("BEGIN IMMEDIATE")
+        try:
+            self.connexion.executemany(AJOUT, self.enattente.items())
+        except BaseException:
+            self.connexion.execute("ROLLBACK")
+            raise
+        self.connexion.execute("COMMIT")
+        if self.cache is not None:
+            for utilisateur, points in self.enattente.items():
+                if utilisateur in self.cache:
+                    self.cache[utilisateur] += points
+        self.enattente.clear()
+        self.nbenattente = 0
+
+    def migrer(self, cheminpickle):
+        """
+        Cette méthode importe une seule fois les scores de l'ancien fichier
+        pickle cheminpickle. Le nom du fichier est noté dans la base,
+        on ne l'importe donc pas deux fois, même depuis deux sessions.
+        Elle renvoie le nombre d'utilisateurs importés.
+        """
+        if not os.path.exists(cheminpickle):
+            return 0
+        self.connexion.execute("BEGIN IMMEDIATE")
+        try:
+            dejamigre = self.connexion.execute(
+                "SELECT 1 FROM migrations WHERE fichier = ?",
+                (os.path.abspath(cheminpickle),)).fetchone()
+            if dejamigre:
+                self.connexion.execute("ROLLBACK")
+                return 0
+            with open(cheminpickle, 'rb') as fichierscores:
+                scores = pickle.Unpickler(fichierscores).load()
+            self.connexion.executemany(AJOUT, scores.items())
+            self.connexion.execute(
+                "INSERT INTO migrations (fichier) VALUES (?)", (os.path.abspath(cheminpickle),))
+        except BaseException:
+            self.connexion.execute("ROLLBACK")
+            raise
+        self.connexion.execute("COMMIT")
+        return len(scores)
+
+    def meilleurs(self, nombre=10):
+        """
+        Cette méthode renvoie les nombre meilleurs (utilisateur, score),
+        du meilleur au moins bon. Les ex aequo sont classés par nom.
+        On lit les premières lignes de l'index classement, sans trier.
+        """
+        self.vider()
+        return self.connexion.execute(
+            "SELECT utilisateur, score FROM scores ORDER BY score DESC, utilisateur LIMIT ?",
+            (nombre,)).fetchall()
+
+    def rang(self, utilisateur):
+        """
+        Cette méthode renvoie le rang de l'utilisateur (1 pour le meilleur),
+        ou None s'il n'a pas de score. On additionne les effectifs des scores
+        supérieurs, puis on compte les ex aequo placés avant lui.
+        """
+        self.vider()
+        ligne = self.connexion.execute(
+            "SELECT score FROM scores WHERE utilisateur = ?", (utilisateur,)).fetchone()
+        if ligne is None:
+            return None
+        score = ligne[0]
+        devant = self.connexion.execute(
+            "SELECT (SELECT COALESCE(SUM(nombre), 0) FROM effectifs WHERE score > ?)"
+            " + (SELECT COUNT(*) FROM scores WHERE score = ? AND utilisateur < ?)",
+            (score, score, utilisateur)).fetchone()[0]
+        return devant + 1
+
+    def autour(self, rang, nombre=5):
+        """
+        Cette méthode renvoie les (rang, utilisateur, score) des nombre
+        utilisateurs avant le rang, de l'utilisateur à ce rang et des nombre
+        utilisateurs après lui. La liste est vide si personne n'a ce rang.
+        """
+        self.vider()
+        if rang < 1:
+            return []
+        # On cherche le score au rang voulu avec les effectifs...
+        devant = 0
+        for score, effectif in self.connexion.execute(
+                "SELECT score, nombre FROM effectifs ORDER BY score DESC"):
+            if devant + effectif >= rang:
+                break
+            devant += effectif
+        else:
+            return []
+        # ... puis l'utilisateur parmi les ex aequo
+        utilisateur, = self.connexion.execute(
+            "SELECT utilisateur FROM scores WHERE score = ? ORDER BY utilisateur LIMIT 1 OFFSET ?",
+            (score, rang - devant - 1)).fetchone()
+        # Les voisins se lisent dans l'index, à partir de l'utilisateur, dans les deux sens :
+        # d'abord les ex aequo, puis les scores suivants
+        avant = self.connexion.execute(
+            "SELECT utilisateur, score FROM scores WHERE score = ? AND utilisateur < ?"
+            " ORDER BY utilisateur DESC LIMIT ?", (score, utilisateur, nombre)).fetchall()
+        avant += self.connexion.execute(
+            "SELECT utilisateur, score FROM scores WHERE score > ?"
+            " ORDER BY score, utilisateur DESC LIMIT ?", (score, nombre - len(avant))).fetchall()
+        apres = self.connexion.execute(
+            "SELECT utilisateur, score FROM scores WHERE score = ? AND utilisateur > ?"
+            " ORDER BY utilisateur LIMIT ?", (score, utilisateur, nombre)).fetchall()
+        apres += self.connexion.execute(
+            "SELECT utilisateur, score FROM scores WHERE score < ?"
+            " ORDER BY score DESC, utilisateur LIMIT ?", (score, nombre - len(apres))).fetchall()
+        lignes = avant[::-1] + [(utilisateur, score)] + apres
+        premier = rang - len(avant)
+        return [(premier + decalage, nom, points) for decalage, (nom, points) in enumerate(lignes)]
+
+    def fermer(self):
+        """
+        Cette méthode écrit les points en attente et ferme la base.
+        """
+        self.vider()
+        self.connexion.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
@@ -0,0 +1,89 @@
+# Word selection from large word files.
+#
+# A word file has one word per line and can be plain text or compressed with
+# gzip, bz2 or xz. Files are decompressed as they're read, so nothing is
+# written to disk, and words are picked with reservoir sampling in a single
+# pass, so only the sampled words are ever held in memory.
+import bz2
+import gzip
+import lzma
+import math
+import os
+import random
+from itertools import islice
+
+# The function opening a word file, by extension. Anything else is read as plain text.
+OPENERS = {'.gz': gzip.open, '.bz2': bz2.open, '.xz': lzma.open, '.lzma': lzma.open}
+
+def read_words(path: str):
+    ''' Yield the words of a word file. Lines that aren't a single word made of letters are skipped. '''
+    opener = OPENERS.get(os.path.splitext(path)[1], open)
+    with opener(path, 'rt', encoding='utf-8') as file:
+        for line in file:
+            word = line.strip().lower()
+            if word.isalpha():
+                yield word
+
+def sample(words, k: int = 1, rng=random) -> list:
+    ''' Pick k words uniformly from an iterable of words in a single pass.
+
+        Instead of drawing a random number for every word, the number of words to
+        skip before the next replacement is drawn directly (Li's Algorithm L), so
+        most words are read and skipped without any other work.
+        >>> sorted(sample(['camel', 'football'], k=5))
+        ['camel', 'football']
+        >>> rng = random.Random(1)
+        >>> counts = {word: 0 for word in 'abcde'}
+        >>> for _ in range(10_000):
+        ...     for word in sample('abcde', k=2, rng=rng): counts[word] += 1
+        >>> all(3_800 < count < 4_200 for count in counts.values())
+        True
+    '''
+    words = iter(words)
+    reservoir = list(islice(words, k))
+    if len(reservoir) < k:
+        rng.shuffle(reservoir)
+        return reservoir
+
+    # 1 - rng.random() is never 0, so its log is always defined.
+    w = math.exp(math.log(1 - rng.random()) / k)
+    while w < 1:
+        skip = math.floor(math.log(1 - rng.random()) / math.log(1 - w))
+        word = next(islice(words, skip, None), None)
+        if word is None:
+            break
+        reservoir[rng.randrange(k)] = word
+        w *= math.exp(math.log(1 - rng.random()) / k)
+    return reservoir
+
+def choose_word(path: str, rng=random) -> str:
+    ''' Pick one word uniformly from a word file. '''
+    words = sample(read_words(path), 1, rng)
+    if not words:
+        raise ValueError(f'{path} does not contain any word.')
+    return words[0]
+
+def load_pool(path: str, size: int = 1000, cache_path: str = None, rng=random) -> list:
+    ''' Return a pool of up to size words sampled from a word file.
+
+        With a cache_path the pool is saved there, one word per line, and later
+        games read the pool instead of scanning the word file again. The pool is
+        sampled again when the word file is newer than the cache.
+    '''
+    if cache_path and os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(path):
+        with open(cache_path, encoding='utf-8') as file:
+            pool = file.read().split()
+        if pool:
+            return pool
+
+    pool = sample(read_words(path), size, rng)
+    if not pool:
+        raise ValueError(f'{path} does not contain any word.')
+    if cache_path:
+        with open(cache_path, 'w', encoding='utf-8') as file:
+            file.write('\n'.join(pool) + '\n')
+    return pool
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(optionflags=doctest.IGNORE_EXCEPTION_DETAIL)